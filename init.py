@@ -7,8 +7,11 @@
 # OS: Windows, terminal: Windows Terminal, shell: PowerShell, explorer: Windows Explorer
 
 from __future__ import annotations
-import os, sys, locale, time, fnmatch, shutil, subprocess, traceback, io
+import os, sys, stat, locale, time, fnmatch, shutil, subprocess, traceback, functools, re, threading, queue, bisect
 from pathlib import Path
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from array import array
 from dataclasses import dataclass, field
 
 # UTF-8 bootstrap
@@ -28,10 +31,14 @@ except Exception:
 
 # Optional libs
 try:
-    from wcwidth import wcwidth, wcswidth
+    from cwcwidth import wcwidth  # same API over the C library's wcwidth(3)
     HAVE_WCWIDTH = True
 except Exception:
-    HAVE_WCWIDTH = False
+    try:
+        from wcwidth import wcwidth
+        HAVE_WCWIDTH = True
+    except Exception:
+        HAVE_WCWIDTH = False
 
 try:
     import curses
@@ -39,19 +46,48 @@ except Exception:
     raise SystemExit("curses not available. On Windows: pip install windows-curses")
 
 try:
-    from pygments import lex
-    from pygments.lexers import guess_lexer_for_filename, TextLexer
-    from pygments.token import Token
-    PYGMENTS = True
+    import pathspec
+    HAVE_PATHSPEC = True
 except Exception:
-    PYGMENTS = False
+    HAVE_PATHSPEC = False
+
+# Pygments is the slowest import we have; it is loaded on the first text preview instead
+PYGMENTS = None  # None = not tried yet
+
+def load_pygments() -> bool:
+    global PYGMENTS, lex, guess_lexer_for_filename, TextLexer, Token
+    if PYGMENTS is None:
+        try:
+            from pygments import lex
+            from pygments.lexers import guess_lexer_for_filename, TextLexer
+            from pygments.token import Token
+            PYGMENTS = True
+        except Exception:
+            PYGMENTS = False
+    return PYGMENTS
 
 # Constants
 MIN_W, MIN_H = 40, 8
+RESIZE_MSG = f"Resize terminal min {MIN_W}x{MIN_H}"
+HELP_MSG = "Commands: cd <path>, ls, catlsr, cat <f>, mkdir, touch, rename, duplicate, chmod, move, quit"
+WHEEL_STEP, WHEEL_WINDOW = 3, 0.016  # lines per wheel notch; burst window coalesced into one frame (s)
+# key codes compared on every keypress, built once instead of an ord() call per comparison
+KEY_ESC, KEY_NL, KEY_Q = 27, ord("\n"), ord("q")
+KEYS_VISUAL = (ord("v"), ord("V"))
+FRAME_MIN = 1 / 60  # while keys are queued (autorepeat), draw at most this often (s)
 PREVIEW_MAX = 400 * 300
+PREVIEW_CACHE_FILES = 32  # files whose text and split lines State keeps for preview and scrolling
+IO_WAIT, IO_POLL_MS = 0.01, 30  # wait for a background preview read before showing "loading"; poll interval after
 IGNORE_DIRS = {"__pycache__", "node_modules", ".git", ".venv", "venv", "env", ".idea"}
 IGNORE_PATTERNS = {"*.pyc", "*.pyo", "*.so", "*.dll", "*.exe", "*.log", "*.db", "*.DS_Store"}
 IGNORE_NAMES = {"Thumbs.db"}
+# suffixes that settle text-vs-binary without opening the file
+TEXT_EXTS = frozenset({'.py','.md','.txt','.js','.ts','.rs','.go','.c','.h','.cpp','.hpp','.java','.sh',
+                       '.yaml','.yml','.toml','.ini','.cfg','.json','.xml','.html','.css','.rb','.lua','.sql'})
+BINARY_EXTS = frozenset({'.png','.jpg','.jpeg','.gif','.webp','.ico','.psd','.ai','.zip','.tar','.gz','.bz2','.xz',
+                         '.7z','.whl','.jar','.pdf','.pyc','.pyo','.so','.dylib','.dll','.exe','.class','.o','.obj',
+                         '.a','.lib','.mp3','.mp4','.mov','.wav','.flac','.ogg','.woff','.woff2','.ttf','.otf',
+                         '.blend','.fbx','.3ds','.max'})
 SPLIT = "-" * 69
 ERRLOG = Path("fiander_error.log")
 
@@ -70,45 +106,64 @@ SPECIAL = {'dockerfile':'🐳','readme.md':'📖','.gitignore':'🚫','.env':'
 # Utilities
 def log_exc(e: BaseException):
     try:
-        ERRLOG.write_text("".join(traceback.format_exception(type(e), e, e.__traceback__)), encoding='utf-8', errors='replace')
+        # one open/write/close on a raw fd: the crash path should not lean on more I/O machinery than it must
+        tb = "".join(traceback.TracebackException.from_exception(e).format()).encode('utf-8', 'replace')
+        fd = os.open(ERRLOG, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try: os.write(fd, tb)
+        finally: os.close(fd)
     except Exception:
         pass
 
-def is_emoji(ch: str) -> bool:
-    """Check if character is likely an emoji"""
-    if not ch: return False
+# BMP characters with Emoji_Presentation: drawn two cells wide though older wcwidth tables say 1
+WIDE_EMOJI_BMP = frozenset(cp for lo, hi in (
+    (0x231A, 0x231B), (0x23E9, 0x23EC), (0x23F0, 0x23F0), (0x23F3, 0x23F3), (0x25FD, 0x25FE), (0x2614, 0x2615),
+    (0x2648, 0x2653), (0x267F, 0x267F), (0x2693, 0x2693), (0x26A1, 0x26A1), (0x26AA, 0x26AB), (0x26BD, 0x26BE),
+    (0x26C4, 0x26C5), (0x26CE, 0x26CE), (0x26D4, 0x26D4), (0x26EA, 0x26EA), (0x26F2, 0x26F3), (0x26F5, 0x26F5),
+    (0x26FA, 0x26FA), (0x26FD, 0x26FD), (0x2705, 0x2705), (0x270A, 0x270B), (0x2728, 0x2728), (0x274C, 0x274C),
+    (0x274E, 0x274E), (0x2753, 0x2755), (0x2757, 0x2757), (0x2795, 0x2797), (0x27B0, 0x27B0), (0x27BF, 0x27BF),
+    (0x2B1B, 0x2B1C), (0x2B50, 0x2B50), (0x2B55, 0x2B55)) for cp in range(lo, hi + 1))
+# emoji blocks past the BMP as sorted half-open bounds: a codepoint is inside one when an odd number of bounds are <= it
+_SMP_EMOJI_BOUNDS = (
+    0x1F000, 0x1F030,  # Mahjong Tiles
+    0x1F0A0, 0x1F100,  # Playing Cards
+    0x1F300, 0x1FA00,  # Misc Symbols and Pictographs, Emoticons, etc.
+    0x1FA70, 0x1FB00,  # Symbols and Pictographs Extended-A
+)
+VS16 = "\ufe0f"  # emoji presentation selector: widens a narrow character before it to two cells
+
+def char_width(ch: str) -> int:
+    """Cells one character takes, emojis as 2 and variation selectors as 0; negative wcwidth counts as 1 (not 0)"""
     cp = ord(ch)
-    # Common emoji ranges
-    return (
-        0x1F300 <= cp <= 0x1F9FF or  # Misc Symbols and Pictographs, Emoticons, etc.
-        0x2600 <= cp <= 0x26FF or    # Misc symbols
-        0x2700 <= cp <= 0x27BF or    # Dingbats
-        0xFE00 <= cp <= 0xFE0F or    # Variation selectors
-        0x1F000 <= cp <= 0x1F02F or  # Mahjong Tiles
-        0x1F0A0 <= cp <= 0x1F0FF     # Playing Cards
-    )
+    if 0xFE00 <= cp <= 0xFE0F: return 0
+    if cp in WIDE_EMOJI_BMP or bisect.bisect_right(_SMP_EMOJI_BOUNDS, cp) & 1: return 2
+    if not HAVE_WCWIDTH: return 1
+    try: cw = wcwidth(ch)
+    except Exception: return 1
+    return 1 if cw < 0 else cw
+
+_WIDTH_CACHE = {}  # char -> char_width, filled on first sight
 
 def display_width(s: str) -> int:
     """Calculate display width, treating emojis as width 2"""
     if s is None: return 0
-    total = 0
+    return _display_width(s)
+
+# names and source lines repeat from frame to frame, so their widths are measured once
+@functools.lru_cache(maxsize=8192)
+def _display_width(s: str) -> int:
+    # ASCII is one cell per char, bar NUL which wcwidth gives 0
+    if s.isascii(): return len(s) - s.count("\0") if HAVE_WCWIDTH else len(s)
+    # base: width of the last character a VS16 may still widen (0 once one has)
+    get = _WIDTH_CACHE.get; total = base = 0
     for ch in s:
-        if is_emoji(ch):
-            total += 2  # Emojis are typically 2 cells wide
-            continue
-        if HAVE_WCWIDTH:
-            try:
-                cw = wcwidth(ch)
-                if cw < 0:  # Treat negative as width 1 (not 0)
-                    total += 1
-                else:
-                    total += cw
-            except Exception:
-                total += 1
+        if ch == VS16: cw = base == 1; base = 0
         else:
-            total += 1
+            cw = base = get(ch)
+            if cw is None: cw = base = _WIDTH_CACHE[ch] = char_width(ch)
+        total += cw
     return total
 
+@functools.lru_cache(maxsize=2048)
 def truncate_to(s: str, maxw: int, ell="") -> str:
     """Truncate string to max display width"""
     if s is None: return ""
@@ -117,25 +172,19 @@ def truncate_to(s: str, maxw: int, ell="") -> str:
     ell_w = display_width(ell)
     aw = maxw - ell_w
     if aw <= 0: return ell if ell_w <= maxw else ""
-    
-    out, w = [], 0
+    if s.isascii() and "\0" not in s: return s[:aw] + ell
+
+    out, w, base = [], 0, 0; get = _WIDTH_CACHE.get
     for ch in s:
-        if is_emoji(ch):
-            cw = 2
-        elif HAVE_WCWIDTH:
-            try:
-                cw = wcwidth(ch)
-                cw = 1 if cw < 0 else cw
-            except Exception:
-                cw = 1
+        if ch == VS16: cw = base == 1; base = 0
         else:
-            cw = 1
-        
+            cw = base = get(ch)
+            if cw is None: cw = base = _WIDTH_CACHE[ch] = char_width(ch)
         if w + cw > aw:
             break
         out.append(ch)
         w += cw
-    
+
     return "".join(out) + ell
 
 def clipped_add(win, y, x, txt, maxw, attr=curses.A_NORMAL):
@@ -149,62 +198,276 @@ def clipped_add(win, y, x, txt, maxw, attr=curses.A_NORMAL):
         try: win.addnstr(y, x, " " * maxw, maxw)
         except Exception: pass
 
-def is_text_file(p: Path, n=4096):
+@functools.lru_cache(maxsize=4096)
+def _sniff_text(path_str: str, mtime_ns: int, size: int, n: int) -> bool:
+    # a raw fd and one read(2): no buffered file object for n bytes
     try:
-        with p.open("rb") as fh:
-            chunk = fh.read(n)
-            return not (chunk and b'\x00' in chunk)
+        fd = os.open(path_str, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try: return b'\x00' not in os.read(fd, n)
+        finally: os.close(fd)
     except Exception:
         return False
 
+def is_text_file(p: Path, n=512):
+    # known extensions answer without touching the file; otherwise one stat, and a read only when it changed
+    ext = os.path.splitext(p)[1].lower()
+    if ext in TEXT_EXTS: return True
+    if ext in BINARY_EXTS: return False
+    try: s = os.stat(p)
+    except Exception: return False
+    return _sniff_text(str(p), s.st_mtime_ns, s.st_size, n)
+
 def safe_read(p: Path, maxc=PREVIEW_MAX):
+    # read(n) stops after maxc characters instead of pulling the whole file and slicing
     try:
-        return p.read_text(encoding='utf-8', errors='replace')[:maxc]
+        with open(p, encoding='utf-8', errors='replace') as fh: return fh.read(maxc)
     except Exception as e:
         return f"[error reading file: {e}]"
 
-def emoji_for(p: Path) -> str:
+# Lexer guessing ranks every installed lexer; do it once per file head
+_LEXER_CACHE: dict = {}
+
+def get_lexer(path: Path, content: str):
+    key = (str(path), path.suffix.lower(), hash(content[:512]))
+    lexer = _LEXER_CACHE.get(key)
+    if lexer is None:
+        try: lexer = guess_lexer_for_filename(str(path), content, stripnl=False)
+        except Exception: lexer = TextLexer(stripnl=False)
+        if len(_LEXER_CACHE) >= 256: _LEXER_CACHE.clear()
+        _LEXER_CACHE[key] = lexer
+    return lexer
+
+# Single-pass lexers for the formats previewed most; re.finditer runs in C where
+# Pygments walks its state machine in Python. Unmatched gaps are plain text.
+_PY_LEX = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<com>\#[^\r\n]*)
+  | (?P<str>[rRbBuUfF]{0,2}(?:"""(?:[^"\\]|\\[\s\S]|"(?!""))*(?:"""|\Z)|\'\'\'(?:[^'\\]|\\[\s\S]|'(?!''))*(?:\'\'\'|\Z)
+             |"(?:[^"\\\r\n]|\\[\s\S])*"?|'(?:[^'\\\r\n]|\\[\s\S])*'?))
+  | (?P<name>[^\W\d]\w*)
+  | (?P<num>(?:0[xXoObB][\da-fA-F_]+|(?:\d[\d_]*\.?[\d_]*|\.\d[\d_]*)(?:[eE][+-]?\d+)?)[jJ]?)
+''', re.X)
+# and/or/not/in/is are operators to Pygments and stay uncoloured
+_PY_KEYWORDS = frozenset('''False None True as assert async await break class continue def del elif else
+    except finally for from global if import lambda nonlocal pass raise return try while with yield'''.split())
+_PY_OPS = 'add sub mul matmul truediv floordiv mod divmod pow lshift rshift and xor or'.split()
+_PY_MAGIC = frozenset(f'__{n}__' for n in '''init new del repr str bytes format lt le eq ne gt ge hash bool getattr
+    getattribute setattr delattr dir get set delete set_name init_subclass class_getitem call len length_hint getitem
+    setitem delitem missing iter reversed contains neg pos abs invert complex int float index round trunc floor ceil
+    enter exit aenter aexit await aiter anext next instancecheck subclasscheck prepare'''.split() + _PY_OPS
+    + ['r' + n for n in _PY_OPS] + ['i' + n for n in _PY_OPS])
+# {expr!conv:spec}; only expr (brackets one level deep) is code
+_FSTR_FIELD = re.compile(r"\{\{|\}\}|\{((?:[^!:\[\](){}'\"]|\[[^\]]*\]|\([^)]*\))*)[^{}]*\}")
+_JSON_LEX = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<str>"(?:[^"\\\r\n]|\\.)*"?)(?P<key>\s*:)?
+  | (?P<kw>\b(?:true|false|null)\b)
+  | (?P<num>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+''', re.X)
+
+def lex_python(content: str):
+    pending = None  # def/class name styling for the next identifier
+    pos = 0
+    for m in _PY_LEX.finditer(content):
+        start = m.start()
+        if start > pos: yield Token.Text, content[pos:start]
+        pos = m.end(); kind = m.lastgroup; val = m.group()
+        if kind == 'name':
+            if pending: yield pending, val; pending = None
+            elif val in _PY_KEYWORDS:
+                yield Token.Keyword, val
+                if val == 'def': pending = Token.Name.Function
+                elif val == 'class': pending = Token.Name.Class
+            elif val in _PY_MAGIC: yield Token.Name.Function.Magic, val
+            else: yield Token.Name, val
+            continue
+        if kind != 'ws': pending = None
+        # only the prefix before the quote decides: "foo {a}" is a plain string
+        if kind == 'str' and 'f' in val[:len(val) - len(val.lstrip('rRbBuUfF'))].lower(): yield from lex_fstring(val); continue
+        yield (Token.Text if kind == 'ws' else Token.Comment if kind == 'com'
+               else Token.String if kind == 'str' else Token.Number), val
+    if pos < len(content): yield Token.Text, content[pos:]
+
+def lex_fstring(val: str):
+    """f-string literal: replacement fields are lexed as code, the rest is string"""
+    pos = 0
+    for m in _FSTR_FIELD.finditer(val):
+        if m.start(1) < 0: continue  # {{ or }}
+        yield Token.String, val[pos:m.start(1)]
+        yield from lex_python(m.group(1))
+        pos = m.end(1)
+    yield Token.String, val[pos:]
+
+def lex_json(content: str):
+    pos = 0
+    for m in _JSON_LEX.finditer(content):
+        start = m.start()
+        if start > pos: yield Token.Text, content[pos:start]
+        pos = m.end(); kind = m.lastgroup
+        if kind == 'key':
+            # object keys are tags to Pygments, not strings
+            yield Token.Name.Tag, m.group('str'); yield Token.Text, m.group('key')
+        else: yield {'ws': Token.Text, 'str': Token.String, 'kw': Token.Keyword.Constant, 'num': Token.Number}[kind], m.group()
+    if pos < len(content): yield Token.Text, content[pos:]
+
+# Python and JSON only; every other language (JS, C, Markdown, YAML, shell, ...) still goes
+# through Pygments, lazily, via line_tokens
+FAST_LEXERS = {'.py': lex_python, '.pyw': lex_python, '.pyi': lex_python, '.json': lex_json}
+
+# Token type -> curses attr, resolved once through the parent chain
+_COLOR_CACHE: dict = {}
+
+def resolve_color(ttype, cmap):
+    color = _COLOR_CACHE.get(ttype)
+    if color is None:
+        parent = ttype
+        while parent and parent not in cmap:
+            parent = parent.parent
+        color = _COLOR_CACHE[ttype] = cmap.get(parent, curses.A_NORMAL)
+    return color
+
+# Token stream split per line, consumed only as far as the preview has scrolled:
+# path -> [text lexed, [[(ttype, text), ...], ...], [styled runs or None, ...], stream or None]
+_TOKEN_CACHE: OrderedDict = OrderedDict()
+TOKEN_CACHE_FILES = 16
+
+def styled_runs(tokens, cmap):
+    """Resolve token types to curses attrs once and merge neighbours that draw alike.
+    Leading whitespace becomes an (None, text) run the renderer only steps over."""
+    out = []; flat = _COLOR_CACHE.get
+    for ttype, text in tokens:
+        if text.isspace():
+            # plain spaces can ride along with the previous run; tabs would be expanded by curses
+            if out and out[-1][0] is not None and not text.strip(' '): out[-1] = (out[-1][0], out[-1][1] + text)
+            else: out.append((None, text))
+            continue
+        # flat dict hit; the parent-chain walk only runs the first time a type is seen
+        attr = flat(ttype)
+        if attr is None: attr = resolve_color(ttype, cmap)
+        if out and out[-1][0] == attr: out[-1] = (attr, out[-1][1] + text)
+        else: out.append((attr, text))
+    return out
+
+def line_tokens(path: Path, content: str, cmap):
+    """Lazy token state for path; the lexer only restarts when it is handed a different text.
+    content comes from State's mtime-checked preview cache, so identity stands in for a stat."""
+    key = str(path)
+    hit = _TOKEN_CACHE.get(key)
+    if hit and hit[0] is content:
+        _TOKEN_CACHE.move_to_end(key)
+        return hit
+    fast = FAST_LEXERS.get(path.suffix.lower())
+    # both lexers are generators, so multi-line strings keep their state between pulls
+    stream = iter(fast(content) if fast else lex(content, get_lexer(path, content)))
+    hit = _TOKEN_CACHE[key] = [content, [[]], [], stream]
+    if len(_TOKEN_CACHE) > TOKEN_CACHE_FILES: _TOKEN_CACHE.popitem(last=False)
+    return hit
+
+def line_runs(state, i: int, cmap):
+    """Styled runs for line i (0-based), lexing no further than the end of that line"""
+    lines, styled, stream = state[1], state[2], state[3]
+    # line i is complete once line i+1 has been started
+    while stream is not None and len(lines) <= i + 1:
+        try: ttype, val = next(stream)
+        except Exception: state[3] = stream = None; break
+        # splitlines(True) keeps the line breaks so buckets match content.splitlines()
+        for part in val.splitlines(True):
+            text = part.rstrip("\r\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
+            if text: lines[-1].append((ttype, text))
+            if text != part: lines.append([])
+    if i >= len(lines): return None
+    if len(styled) <= i: styled.extend([None] * (i + 1 - len(styled)))
+    runs = styled[i]
+    if runs is None: runs = styled[i] = styled_runs(lines[i], cmap)
+    return runs
+
+def emoji_for(p: str | Path, is_dir: bool | None = None) -> str:
     try:
-        if p.is_dir(): return EMOJI['dir']
-        n = p.name.lower()
+        if os.path.isdir(p) if is_dir is None else is_dir: return EMOJI['dir']
+        n = os.path.basename(p).lower()
         if n in SPECIAL: return SPECIAL[n]
-        ext = p.suffix.lower()
-        return EMOJI.get(ext, EMOJI['file'])
+        return EMOJI.get(os.path.splitext(n)[1], EMOJI['file'])
     except Exception:
         return EMOJI['file']
 
+# PATH lookups don't change while we run; each one stats several directories
+@functools.lru_cache(maxsize=64)
+def which(cmd: str):
+    return shutil.which(cmd)
+
 # Clipboard helper that prefers clip.exe on Windows
-def write_clipboard(text: str) -> tuple[bool, str]:
-    if os.name == 'nt':
-        try:
-            p = subprocess.Popen(["clip"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            p.communicate(input=text.encode("utf-8"))
-            if p.returncode == 0:
-                return True, "clip.exe"
-        except Exception:
-            pass
-        try:
-            import pyperclip
-            pyperclip.copy(text)
-            return True, "pyperclip"
-        except Exception:
-            return False, "clipboard failed"
+CLIP_CHUNK = 1 << 16
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # threads for I/O-bound batches (catlsr and fl reads, tree copies)
+READ_BATCH = 16  # files per read-ahead task
+CLIP_COMMANDS = (("pbcopy",), ("wl-copy",), ("xclip", "-selection", "clipboard"), ("xsel", "--clipboard", "--input"))
+
+def iter_text_chunks(text):
+    if isinstance(text, str):
+        for i in range(0, len(text), CLIP_CHUNK): yield text[i:i+CLIP_CHUNK]
     else:
+        yield from text
+
+def pipe_to(cmd, text, encoding="utf-8", **kw) -> bool:
+    """Stream text (str or iterable of str) into cmd's stdin, encoding chunk by chunk"""
+    p = subprocess.Popen(cmd, stdin=subprocess.PIPE, **kw)
+    with p.stdin:
+        # clip.exe only takes non-ANSI text as BOM-marked UTF-16
+        if encoding == "utf-16-le": p.stdin.write(b"\xff\xfe")
+        for chunk in iter_text_chunks(text): p.stdin.write(chunk.encode(encoding))
+    return p.wait() == 0
+
+def win_set_clipboard(text: str) -> bool:
+    """Put text on the Windows clipboard as CF_UNICODETEXT in-process, without spawning clip.exe"""
+    import ctypes
+    from ctypes import wintypes
+    k32, u32 = ctypes.windll.kernel32, ctypes.windll.user32
+    # handles are pointer-sized; the default int restype would truncate them on 64-bit
+    k32.GlobalAlloc.argtypes = (wintypes.UINT, ctypes.c_size_t); k32.GlobalAlloc.restype = wintypes.HGLOBAL
+    k32.GlobalLock.argtypes = (wintypes.HGLOBAL,); k32.GlobalLock.restype = ctypes.c_void_p
+    k32.GlobalUnlock.argtypes = k32.GlobalFree.argtypes = (wintypes.HGLOBAL,)
+    u32.OpenClipboard.argtypes = (wintypes.HWND,)
+    u32.SetClipboardData.argtypes = (wintypes.UINT, wintypes.HANDLE); u32.SetClipboardData.restype = wintypes.HANDLE
+    data = text.encode("utf-16-le") + b"\0\0"
+    if not u32.OpenClipboard(None): return False
+    try:
+        u32.EmptyClipboard()
+        h = k32.GlobalAlloc(0x0002, len(data))  # GMEM_MOVEABLE
+        if not h: return False
+        p = k32.GlobalLock(h)
+        if not p: k32.GlobalFree(h); return False
+        ctypes.memmove(p, data, len(data)); k32.GlobalUnlock(h)
+        # CF_UNICODETEXT; on success the clipboard owns the memory
+        if not u32.SetClipboardData(13, h): k32.GlobalFree(h); return False
+        return True
+    finally:
+        u32.CloseClipboard()
+
+def pyperclip_copy(text) -> bool:
+    import pyperclip
+    pyperclip.copy(text if isinstance(text, str) else "".join(text))
+    return True
+
+def clipboard_backends():
+    """(name, writer) pairs for this platform, best first; a writer returns True on success"""
+    if os.name == 'nt':
+        return [("clipboard", lambda t: win_set_clipboard(t if isinstance(t, str) else "".join(t))),
+                ("clip.exe", lambda t: pipe_to(["clip"], t, "utf-16-le", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)),
+                ("pyperclip", pyperclip_copy)]
+    # native tools first: they stream from our pipe, pyperclip needs one big string
+    return [(cmd[0], lambda t, cmd=cmd: pipe_to(list(cmd), t)) for cmd in CLIP_COMMANDS if which(cmd[0])] + [("pyperclip", pyperclip_copy)]
+
+CLIP_LAST = None  # backend that worked last time; tried first so later copies skip the failures
+
+def write_clipboard(text) -> tuple[bool, str]:
+    global CLIP_LAST
+    # a one-shot generator may have to feed more than one backend
+    if not isinstance(text, (str, list, tuple)): text = list(text)
+    for name, write in sorted(clipboard_backends(), key=lambda b: b[0] != CLIP_LAST):
         try:
-            import pyperclip
-            pyperclip.copy(text)
-            return True, "pyperclip"
+            if write(text): CLIP_LAST = name; return True, name
         except Exception:
             pass
-        for cmd in ("pbcopy", "wl-copy", "xclip"):
-            if shutil.which(cmd):
-                try:
-                    p = subprocess.Popen([cmd], stdin=subprocess.PIPE)
-                    p.communicate(input=text.encode("utf-8"))
-                    return (p.returncode == 0, cmd)
-                except Exception:
-                    pass
-        return False, "no-clipboard-backend"
+    return False, "clipboard failed" if os.name == 'nt' else "no-clipboard-backend"
 
 # File walking / search
 def load_gitignore(root: Path):
@@ -215,69 +478,205 @@ def load_gitignore(root: Path):
     except Exception:
         return []
 
-def should_skip(rel: Path, is_dir: bool, gitp):
-    n = rel.name
+def compile_globs(patterns):
+    """name -> bool matcher for a set of glob patterns (None if empty); case-insensitive like fnmatch on Windows.
+    '*.ext' patterns share one endswith() and literal names one set lookup, so only the
+    remaining globs are tried by the union regex."""
+    if not patterns: return None
+    fold = os.name == 'nt'
+    if fold: patterns = [p.lower() for p in patterns]
+    wild = lambda s: any(c in s for c in '*?[')
+    suffixes = tuple(p[1:] for p in patterns if p[:1] == '*' and not wild(p[1:]))
+    names = frozenset(p for p in patterns if not wild(p))
+    rest = [p for p in patterns if wild(p) and not (p[:1] == '*' and not wild(p[1:]))]
+    rx = re.compile("|".join(fnmatch.translate(p) for p in rest)).match if rest else None
+    def match(name: str) -> bool:
+        if fold: name = name.lower()
+        return name.endswith(suffixes) or name in names or (rx is not None and rx(name) is not None)
+    return match
+
+IGNORE_GLOBS = compile_globs(IGNORE_PATTERNS | IGNORE_NAMES)
+
+def compile_gitignore(patterns):
+    """Build a (rel, name, is_dir) -> ignored? matcher, or None when nothing can be ignored;
+    pathspec gives full gitwildmatch semantics when installed"""
+    if not any(not p.startswith('!') for p in patterns): return None  # negations alone un-ignore nothing
+    if HAVE_PATHSPEC:
+        try:
+            spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns)
+            return lambda rel, name, is_dir: spec.match_file(rel.replace(os.sep, '/') + ('/' if is_dir else ''))
+        except Exception:
+            pass
+    # fallback: a pattern with a '/' before its end is anchored at root and matched against the
+    # '/'-separated relative path; the rest match the bare name at any depth. A trailing '/' makes it directory-only
+    def side(ps, dirs_only):
+        ps = [p.rstrip('/') for p in ps if p.endswith('/') == dirs_only]
+        ps = [p[3:] if p.startswith('**/') else p for p in ps]  # '**/x' is x at any depth
+        by_name = compile_globs([p for p in ps if p and '/' not in p])
+        by_path = compile_globs([p.lstrip('/') for p in ps if '/' in p and p.lstrip('/')])
+        if by_path is None: return by_name and (lambda rp, n: by_name(n))
+        return lambda rp, n: (by_name is not None and by_name(n)) or by_path(rp)
+    pos_ps = [p for p in patterns if not p.startswith('!')]; neg_ps = [p[1:] for p in patterns if p.startswith('!')]
+    pos, pos_d, neg, neg_d = side(pos_ps, False), side(pos_ps, True), side(neg_ps, False), side(neg_ps, True)
+    def match(rel, n, is_dir):
+        rp = rel.replace(os.sep, '/')
+        if not ((pos and pos(rp, n)) or (is_dir and pos_d and pos_d(rp, n))): return False
+        return not ((neg and neg(rp, n)) or (is_dir and neg_d and neg_d(rp, n)))
+    return match
+
+@functools.lru_cache(maxsize=16)
+def _gitignore_matcher(root: str, mtime_ns: int, size: int):
+    return compile_gitignore(load_gitignore(Path(root)))
+
+def gitignore_matcher(root: Path):
+    """compile_gitignore for root's .gitignore, recompiled only when that file changes"""
+    try: s = os.stat(os.path.join(root, ".gitignore"))
+    except OSError: return None
+    return _gitignore_matcher(os.fspath(root), s.st_mtime_ns, s.st_size)
+
+def should_skip(rel: str, n: str, is_dir: bool, gitp):
+    # set lookups, then the shared glob matcher (IGNORE_NAMES is folded into it), then .gitignore
     if is_dir and n in IGNORE_DIRS: return True
-    if n in IGNORE_NAMES: return True
-    for pat in IGNORE_PATTERNS:
-        if fnmatch.fnmatch(n, pat): return True
-    for pat in gitp:
-        neg = pat.startswith('!')
-        pattern = pat[1:] if neg else pat
-        if fnmatch.fnmatch(n, pattern): return not neg
-    return False
+    if IGNORE_GLOBS(n): return True
+    return gitp is not None and gitp(rel, n, is_dir)
 
 def walk_files(root: Path, text_only=True):
-    gitp = load_gitignore(root)
-    for top, dirs, files in os.walk(root, topdown=True):
-        top_p = Path(top)
-        rel_top = top_p.relative_to(root)
-        dirs[:] = [d for d in dirs if not should_skip(rel_top / d, True, gitp)]
-        for f in files:
-            rel = rel_top / f if rel_top.parts else Path(f)
-            if should_skip(rel, False, gitp): continue
-            fp = root / rel
-            if text_only and (not is_text_file(fp)): continue
-            yield rel
+    """Yield (rel, abs) path strings for files under root, in os.walk(topdown=True) order.
+    DirEntry carries the file type, so there is no stat and no Path object per entry."""
+    gitp = gitignore_matcher(root)
+    stack = [(os.fspath(root), "")]
+    while stack:
+        top, rel_top = stack.pop()
+        try:
+            with os.scandir(top) as it: ents = list(it)
+        except OSError: continue
+        subdirs = []
+        for e in ents:
+            n = e.name; rel = rel_top + n
+            try: isdir = e.is_dir()
+            except OSError: isdir = False
+            if isdir:
+                # like os.walk, symlinked directories are not descended into
+                if not e.is_symlink() and not should_skip(rel, n, True, gitp): subdirs.append((e.path, rel + os.sep))
+                continue
+            if should_skip(rel, n, False, gitp): continue
+            if text_only and not is_text_file(e.path): continue
+            yield rel, e.path
+        stack.extend(reversed(subdirs))
 
 def fuzzy_score(name: str, q: str):
     name, q = name.lower(), q.lower()
     if not q: return 0.0
-    qi = 0; first = last = None
-    for i,ch in enumerate(name):
-        if qi < len(q) and ch == q[qi]:
-            if first is None: first = i
-            last = i; qi += 1
-    if qi != len(q): return 0.0
-    span = (last - first + 1) if first is not None else len(name)
-    return len(q)/span
+    # leftmost subsequence match, one str.find per query char instead of a Python step per name char;
+    # a name missing any query char is rejected by the first find that fails
+    find = name.find; first = i = find(q[0])
+    if i < 0: return 0.0
+    for ch in q[1:]:
+        i = find(ch, i + 1)
+        if i < 0: return 0.0
+    return len(q)/(i - first + 1)
 
 def search_files(root: Path, q: str, limit=2000):
-    res = [(fuzzy_score(str(r), q), str(r)) for r in walk_files(root, text_only=False)]
-    res = [s for s in sorted(res, key=lambda x:(-x[0],x[1])) if s[0] > 0]
-    return [r for _,r in res][:limit]
+    # only matches are kept and sorted
+    res = [x for x in ((fuzzy_score(rel, q), rel) for rel, _ in walk_files(root, text_only=False)) if x[0] > 0]
+    res.sort(key=lambda x:(-x[0],x[1]))
+    return [r for _,r in res[:limit]]
+
+# line breaks str.splitlines() honours besides \n and \r\n; the preview numbers lines by splitlines()
+_OTHER_BREAKS = re.compile('\r(?!\n)|[\x0b\x0c\x1c-\x1e\x85\u2028\u2029]').search
 
 def search_lines(root: Path, q: str, limit=2000):
     ql = q.lower(); out=[]
-    for rel in walk_files(root, text_only=True):
-        fp = root / rel
-        try: txt = fp.read_text(errors='replace')
-        except Exception: continue
-        for i,line in enumerate(txt.splitlines(), 1):
-            if ql in line.lower():
-                out.append((str(rel), i, line.strip()))
-                if len(out) >= limit: return out
+    # the text sniff and the read of each file run on the read-ahead pool; matching stays here, in walk order
+    for rel, txt in read_ahead(walk_files(root, text_only=False), read_text_file):
+        if txt is None: continue
+        low = txt.lower()
+        if not ql or len(low) != len(txt) or _OTHER_BREAKS(txt):
+            # empty query matches every line; case folding that changes length breaks offsets;
+            # counting only \n would number lines differently from splitlines()
+            for i,line in enumerate(txt.splitlines(), 1):
+                if ql in line.lower():
+                    out.append((rel, i, line.strip()))
+                    if len(out) >= limit: return out
+            continue
+        # find hits in the whole text and count newlines up to them instead of splitting every line
+        pos = low.find(ql); ln = 1; last = 0
+        while pos >= 0:
+            ln += txt.count('\n', last, pos); last = pos
+            bol = txt.rfind('\n', 0, pos) + 1; eol = txt.find('\n', pos)
+            if eol < 0: eol = len(txt)
+            out.append((rel, ln, txt[bol:eol].strip()))
+            if len(out) >= limit: return out
+            pos = low.find(ql, eol)
+    return out
+
+# Directory listing
+class Entry:
+    """One listed directory entry; slots keep a large listing small"""
+    __slots__ = ("name", "path", "is_dir", "is_file", "is_symlink")
+    def __init__(self, name: str, path: str, is_dir: bool, is_file: bool, is_symlink: bool):
+        self.name, self.path, self.is_dir, self.is_file, self.is_symlink = name, path, is_dir, is_file, is_symlink
+
+def list_entries(d: Path) -> list[Entry]:
+    """List a directory dirs-first; scandir carries the file type, so no stat per entry"""
+    out = []
+    with os.scandir(d) as it:
+        for e in it:
+            try: isdir = e.is_dir(); isfile = not isdir and e.is_file()
+            except OSError: isdir = isfile = False
+            out.append(Entry(e.name, e.path, isdir, isfile, e.is_symlink()))
+    out.sort(key=lambda e: (not e.is_dir, e.name.lower()))
     return out
 
+def entry_colors():
+    """Browser attrs (link, dir, known binary, plain file); an entry takes the first that applies"""
+    try: return curses.color_pair(2), curses.color_pair(3), curses.A_DIM, curses.color_pair(0)
+    except Exception: return (curses.A_NORMAL,) * 4
+
+def preview_worker(jobs, done):
+    """Background thread body for preview I/O: directory listings ("dir") and file reads ("file",
+    or "cat" for :cat). Only the newest request of each kind is served; navigation superseded the rest."""
+    while True:
+        job = jobs.get(); newest = {job[0]: job}
+        try:
+            while True: job = jobs.get_nowait(); newest[job[0]] = job
+        except queue.Empty: pass
+        for kind, key, stamp in newest.values():
+            try:
+                if kind == "dir": res = [(entry_label(c.name, c.is_dir), c.is_dir) for c in list_entries(Path(key))]
+                else: text = safe_read(key); res = (text, text.splitlines())
+            except Exception as e: res = e
+            done.put((kind, key, stamp, res))
+
+# a pure function of (name, is_dir): relisting cwd or re-previewing a directory reuses the labels
+@functools.lru_cache(maxsize=4096)
+def entry_label(name: str, is_dir: bool) -> str:
+    """Browser/preview label for one entry"""
+    return f"{emoji_for(name, is_dir)} {name}{'/' if is_dir else ''}"
+
 # State
+_UNSET = object()
+DIRTY_BROWSER, DIRTY_PREVIEW, DIRTY_STATUS = 1, 2, 4
+DIRTY_ALL = DIRTY_BROWSER | DIRTY_PREVIEW | DIRTY_STATUS
+
 @dataclass
 class State:
     cwd: Path = field(default_factory=lambda: Path.cwd().resolve())
-    entries: list[Path] = field(default_factory=list)
+    entries: list[str] = field(default_factory=list)  # entry paths; a Path is only built for the selection
+    entry_count: int = 0  # len(entries), kept by reload()
+    # per-entry columns parallel to entries, filled by reload() for the draw loop
+    names: list[str] = field(default_factory=list)
+    names_display: list[str] = field(default_factory=list)
+    is_dir: bytearray = field(default_factory=bytearray)
+    is_file: bytearray = field(default_factory=bytearray)
+    is_symlink: bytearray = field(default_factory=bytearray)
+    is_binary: bytearray = field(default_factory=bytearray)  # by suffix only, no file I/O
+    colors: array = field(default_factory=lambda: array('i'))
+    _is_text: bytearray = field(default_factory=bytearray, repr=False)  # 0 unknown, 1 text, 2 not text; sniffed lazily
     selected: int = 0
     top: int = 0
     mode: str = "browser"
-    input_buf: str = ""
+    input_buf: bytearray = field(default_factory=bytearray)  # prompt text (printable ASCII), edited in place
     status: str = "Ready"
     last_output: str | None = None
     show_output: bool = False
@@ -293,32 +692,80 @@ class State:
     search_results: list = field(default_factory=list)
     search_sel: int = 0
     force_redraw: bool = True
+    cursor_visible: bool = False  # hidden once at startup, shown only while typing
+    # terminal geometry, refreshed only on KEY_RESIZE (height 0 = unknown)
+    height: int = 0
+    width: int = 0
+    left_w: int = 0
+    preview_w: int = 0
     dir_history: dict = field(default_factory=dict)  # path -> selected filename
+    cwd_mtime: int = 0  # st_mtime_ns of cwd when it was last listed
+    _preview_cache: OrderedDict = field(default_factory=OrderedDict, repr=False)  # path -> ((mtime_ns, size), text, lines)
+    _preview_checked: str = field(default="", repr=False)  # file whose mtime preview_text last checked, and when
+    _preview_at: float = field(default=0.0, repr=False)
+    _dir_cache: OrderedDict = field(default_factory=OrderedDict, repr=False)  # dir path -> (mtime_ns, [(label, is_dir)])
+    # preview reads that miss the caches run on a background thread, started on the first miss
+    _io_jobs: object = field(default=None, repr=False)  # queue.Queue of (kind, path, stamp)
+    _io_done: object = field(default_factory=queue.Queue, repr=False)  # (kind, path, stamp, result or exception)
+    _io_pending: dict = field(default_factory=dict, repr=False)  # kind -> newest (path, stamp) posted, not yet back
+    _output_cache: tuple = field(default=(None, ()), repr=False)  # (last_output it was split from, lines)
+    # previous frame's row keys per pane; rows whose key is unchanged are not redrawn
+    _shadow_browser: list = field(default_factory=list, repr=False)
+    _shadow_preview: list = field(default_factory=list, repr=False)
+    _shadow_status: list = field(default_factory=lambda: [None, None], repr=False)
+    dirty: int = DIRTY_ALL  # DIRTY_* bits of the panes to draw next frame
+    # panes each attribute is shown in; attributes not listed here dirty every pane
+    _PANES = {"status": DIRTY_STATUS, "input_buf": DIRTY_STATUS, "mode": DIRTY_STATUS, "search_mode": DIRTY_STATUS,
+              "top": DIRTY_BROWSER, "selected": DIRTY_BROWSER | DIRTY_PREVIEW,
+              "preview_scroll": DIRTY_PREVIEW, "preview_line": DIRTY_PREVIEW, "selection_mode": DIRTY_PREVIEW,
+              "sel_start": DIRTY_PREVIEW, "sel_end": DIRTY_PREVIEW, "out_scroll": DIRTY_PREVIEW,
+              "show_output": DIRTY_PREVIEW, "last_output": DIRTY_PREVIEW,
+              # bookkeeping that is never drawn
+              "dirty": 0, "cursor_visible": 0, "dir_history": 0, "cwd_mtime": 0, "search_results": 0, "search_sel": 0,
+              "clipboard_path": 0, "clipboard_action": 0, "_preview_cache": 0, "_preview_checked": 0, "_preview_at": 0, "_dir_cache": 0, "_io_jobs": 0, "_output_cache": 0, "_is_text": 0, "_shadow_browser": 0, "_shadow_preview": 0, "_shadow_status": 0}
+
+    def __setattr__(self, name, value):
+        """Assign, marking the panes that show this attribute dirty when its value actually changes."""
+        d = self.__dict__  # plain fields only, so the instance dict can be written directly
+        mask = _PANES_GET(name, DIRTY_ALL)
+        if mask:
+            old = d.get(name, _UNSET)
+            if old is not value and old != value: d["dirty"] = d.get("dirty", 0) | mask
+        d[name] = value
 
     def reload(self, remember_child: Path | None = None):
+        # taken before listing, so a change made while we list is still seen as one
+        try: self.cwd_mtime = os.stat(self.cwd).st_mtime_ns
+        except Exception: self.cwd_mtime = 0
         try:
-            self.entries = sorted(list(self.cwd.iterdir()), key=lambda p: (not p.is_dir(), p.name.lower()))
+            info = list_entries(self.cwd)
         except Exception:
-            self.entries = []
+            info = []
+        self.entries = [e.path for e in info]
+        self.entry_count = len(info)
+        self.names = [e.name for e in info]
+        self.is_dir = bytearray(e.is_dir for e in info)
+        self.is_file = bytearray(e.is_file for e in info)
+        self.is_symlink = bytearray(e.is_symlink for e in info)
+        self.is_binary = bytearray(not e.is_dir and os.path.splitext(e.name)[1].lower() in BINARY_EXTS for e in info)
+        self._is_text = bytearray(len(info))
+        self.names_display = [entry_label(n, d) for n, d in zip(self.names, self.is_dir)]
+        # draw_browser just indexes this
+        link_c, dir_c, bin_c, file_c = entry_colors()
+        self.colors = array('i', (link_c if l else dir_c if d else bin_c if b else file_c
+                                  for d, l, b in zip(self.is_dir, self.is_symlink, self.is_binary)))
+        # lexers and token state stay: both are bounded and keyed on the file's path and text, so
+        # coming back to a file after a cd picks up where its preview left off
+        _sniff_text.cache_clear()
         
-        # Try to restore selection based on child dir or history
-        if remember_child:
-            for i, entry in enumerate(self.entries):
-                try:
-                    if entry.resolve() == remember_child.resolve():
-                        self.selected = i
-                        break
-                except Exception:
-                    pass
-        elif str(self.cwd) in self.dir_history:
-            remembered = self.dir_history[str(self.cwd)]
-            for i, entry in enumerate(self.entries):
-                if entry.name == remembered:
-                    self.selected = i
-                    break
+        # Try to restore selection based on child dir or history (a scan of the names column, no stat)
+        remembered = remember_child.name if remember_child else self.dir_history.get(str(self.cwd))
+        i = self.index_of(remembered) if remembered else -1
+        if i >= 0:
+            self.selected = i
         
         # Ensure selected index is valid
-        self.selected = min(self.selected, max(0, len(self.entries)-1))
+        self.selected = min(self.selected, max(0, self.entry_count-1))
 
         # Keep preview state reset
         self.preview_scroll = 0
@@ -332,10 +779,178 @@ class State:
         except Exception:
             self.top = 0
 
-        self.force_redraw = True
+        # every row is repainted against empty shadows; curses then sends only the cells that
+        # differ, so a cd costs no clear-screen and full-terminal repaint
+        self.invalidate_shadows(); self.dirty |= DIRTY_ALL
+
+    def add_entry(self, path, select=False):
+        """Splice one new or changed entry into the listing at its sorted place instead of relisting cwd.
+        Paths outside cwd are ignored."""
+        path = os.path.normpath(os.path.join(self.cwd, path))
+        if os.path.dirname(path) != os.path.normpath(self.cwd) or not os.path.lexists(path): return
+        name = os.path.basename(path)
+        if self.index_of(name) >= 0: self.drop_entry(path)  # overwritten in place
+        isdir = os.path.isdir(path); isfile = not isdir and os.path.isfile(path); islink = os.path.islink(path)
+        isbin = not isdir and os.path.splitext(name)[1].lower() in BINARY_EXTS
+        # same order as list_entries: dirs first, then case-folded name
+        keys = [(not d, n.lower()) for d, n in zip(self.is_dir, self.names)]
+        i = bisect.bisect_left(keys, (not isdir, name.lower()))
+        self.entries.insert(i, path); self.names.insert(i, name); self.names_display.insert(i, entry_label(name, isdir))
+        self.is_dir.insert(i, isdir); self.is_file.insert(i, isfile); self.is_symlink.insert(i, islink)
+        self.is_binary.insert(i, isbin); self._is_text.insert(i, 0); self.colors.insert(i, entry_colors()[0 if islink else 1 if isdir else 2 if isbin else 3])
+        self.entry_count += 1
+        if select: self.selected = i
+        elif i <= self.selected and self.entry_count > 1: self.selected += 1  # stay on the same entry
+        self.entries_patched()
+
+    def drop_entry(self, path):
+        """Remove one entry from the listing in place; paths not listed are ignored"""
+        path = os.path.normpath(os.path.join(self.cwd, path))
+        if os.path.dirname(path) != os.path.normpath(self.cwd): return
+        i = self.index_of(os.path.basename(path))
+        if i < 0: return
+        for col in (self.entries, self.names, self.names_display, self.is_dir, self.is_file, self.is_symlink,
+                    self.is_binary, self._is_text, self.colors): del col[i]
+        self.entry_count -= 1
+        if i < self.selected: self.selected -= 1
+        self.selected = min(self.selected, max(0, self.entry_count-1))
+        self.entries_patched()
+
+    def entries_patched(self):
+        # the columns were edited in place, which __setattr__ does not see; the change is ours,
+        # so the external-change check need not relist cwd for it
+        self.dirty |= DIRTY_BROWSER | DIRTY_PREVIEW
+        try: self.cwd_mtime = os.stat(self.cwd).st_mtime_ns
+        except Exception: pass
+
+    def index_of(self, name: str) -> int:
+        """Index of the entry called name, or -1"""
+        try: return self.names.index(name)
+        except ValueError: return -1
+
+    def resize(self, height: int, width: int):
+        self.height, self.width = height, width
+        self.left_w = max(20, width//4)
+        self.preview_w = max(10, width - self.left_w)
+
+    def invalidate_shadows(self):
+        self._shadow_browser = []; self._shadow_preview = []; self._shadow_status = [None, None]
 
     def selected_path(self):
-        return self.entries[self.selected] if self.entries and 0 <= self.selected < len(self.entries) else None
+        return Path(self.entries[self.selected]) if 0 <= self.selected < self.entry_count else None
+
+    def selected_is_text(self):
+        """True when the selection is a regular text file; sniffed at most once per entry per reload"""
+        i = self.selected
+        if not 0 <= i < self.entry_count or not self.is_file[i] or self.is_binary[i]: return False
+        if not self._is_text[i]: self._is_text[i] = 1 if is_text_file(self.entries[i]) else 2
+        return self._is_text[i] == 1
+
+    def preview_text(self, path: str | Path, wait: float | None = None, kind: str = "file"):
+        """Return (text, lines) for path; the file is only re-read when its mtime or size changes.
+        With wait, a miss is read in the background and None is returned if it takes longer than that."""
+        key = str(path); now = time.monotonic()
+        hit = self._preview_cache.get(key)
+        # a burst of keys within one frame revalidates the file once, not once per key
+        if hit and self._preview_checked == key and now - self._preview_at < FRAME_MIN: return hit[1], hit[2]
+        # size joins mtime so a rewrite within one coarse mtime tick (FAT, some network mounts) is still seen
+        try: s = os.stat(key); mtime = (s.st_mtime_ns, s.st_size)
+        except Exception: mtime = None
+        self._preview_checked = key; self._preview_at = now
+        if hit and hit[0] == mtime:
+            self._preview_cache.move_to_end(key)
+            return hit[1], hit[2]
+        if wait is not None:
+            self.post_io(kind, key, mtime)
+            # a :cat read is shown by collect_io when it lands, within wait or later
+            if kind == "cat": return None
+            hit = self._preview_cache.get(key)
+            return (hit[1], hit[2]) if hit and hit[0] == mtime else None
+        text = safe_read(key); lines = text.splitlines()
+        self._preview_cache[key] = (mtime, text, lines)
+        if len(self._preview_cache) > PREVIEW_CACHE_FILES: self._preview_cache.popitem(last=False)
+        return text, lines
+
+    def dir_labels(self, path: Path):
+        """[(label, is_dir)] for a directory preview, or None while it is still being listed.
+        The directory is only relisted when its mtime changes."""
+        key = str(path); mtime = os.stat(key).st_mtime_ns
+        hit = self._dir_cache.get(key)
+        if not (hit and hit[0] == mtime):
+            self.post_io("dir", key, mtime)
+            hit = self._dir_cache.get(key)
+            if not (hit and hit[0] == mtime): return None
+        self._dir_cache.move_to_end(key)
+        if isinstance(hit[1], Exception): raise hit[1]
+        return hit[1]
+
+    def post_io(self, kind: str, key: str, stamp):
+        """Hand a preview read to the background thread (unless that exact one is already out),
+        then wait up to IO_WAIT: local reads come back in time and never flash "loading" """
+        if self._io_pending.get(kind) != (key, stamp):
+            if self._io_jobs is None:
+                self._io_jobs = queue.Queue()
+                threading.Thread(target=preview_worker, args=(self._io_jobs, self._io_done), daemon=True).start()
+            self._io_pending[kind] = (key, stamp); self._io_jobs.put((kind, key, stamp))
+        self.collect_io(IO_WAIT)
+
+    def collect_io(self, wait: float = 0.0) -> bool:
+        """Move finished background reads into their caches, waiting up to wait seconds
+        while any is pending; True when any arrived"""
+        got = False; end = time.monotonic() + wait
+        while True:
+            left = end - time.monotonic()
+            try: kind, key, stamp, res = self._io_done.get(left > 0 and bool(self._io_pending), max(left, 0))
+            except queue.Empty: return got
+            got = True; fresh = self._io_pending.get(kind) == (key, stamp)
+            if fresh: del self._io_pending[kind]
+            if kind == "dir": cache = self._dir_cache; cache[key] = (stamp, res)
+            else: cache = self._preview_cache; cache[key] = (stamp, *res)
+            if len(cache) > PREVIEW_CACHE_FILES: cache.popitem(last=False)
+            # an older :cat the user already moved past only warms the cache
+            if kind == "cat" and fresh: self.show_file(key, *res)
+
+    def show_file(self, key: str, text: str, lines):
+        """Put a file's text in the output pane (:cat), reusing the preview's split lines"""
+        self._output_cache = (text, lines)
+        self.last_output = text; self.show_output = True; self.status = f"Showing {os.path.relpath(key, self.cwd)}"
+
+    def preview_lines(self, path: Path):
+        """Preview lines for scroll bounds and motion; empty while a slow read is still in flight"""
+        res = self.preview_text(path, IO_WAIT)
+        return res[1] if res else []
+
+    def text_rows(self):
+        """Rows of file/output text the preview pane shows (screen minus status rows and pane footer)"""
+        return max(1, (self.height or 25) - 3)
+
+    def preview_max_scroll(self, path: Path):
+        return max(0, len(self.preview_lines(path)) - self.text_rows())
+
+    def output_max_scroll(self):
+        return max(0, len(self.output_lines()) - self.text_rows())
+
+    def input_text(self) -> str:
+        return self.input_buf.decode('ascii', 'replace')
+
+    def input_key(self, key) -> bool:
+        """Apply a prompt editing key to input_buf in place; False when key is not one"""
+        if key in (curses.KEY_BACKSPACE, 127): del self.input_buf[-1:]
+        elif 32 <= key < 127: self.input_buf.append(key)
+        else: return False
+        self.dirty |= DIRTY_STATUS  # in-place edits bypass __setattr__
+        return True
+
+    def clear_input(self):
+        self.input_buf.clear(); self.dirty |= DIRTY_STATUS
+
+    def output_lines(self):
+        """last_output split into lines; split once per new output, not per frame or scroll tick"""
+        src, lines = self._output_cache
+        if src is not self.last_output:
+            lines = self.last_output.splitlines() if self.last_output else []
+            self._output_cache = (self.last_output, lines)
+        return lines
 
     def ensure_visible(self, visible_height: int, scrolloff: int = 5):
         """Adjust self.top so the selected entry is visible within the viewport.
@@ -343,7 +958,7 @@ class State:
         This makes minimal vertical movement and prefers showing the full list when possible.
         """
         try:
-            n = len(self.entries)
+            n = self.entry_count
             if n == 0:
                 self.top = 0
                 return
@@ -372,6 +987,8 @@ class State:
         except Exception:
             pass
 
+_PANES_GET = State._PANES.get  # bound once for State.__setattr__
+
 # Curses drawing
 def init_colors():
     curses.start_color(); curses.use_default_colors()
@@ -379,121 +996,191 @@ def init_colors():
                          curses.COLOR_GREEN, curses.COLOR_YELLOW, curses.COLOR_RED), start=1):
         try: curses.init_pair(i, c, -1)
         except Exception: pass
+    # Pygments token types are tuples (Token.Name.Function == ('Name', 'Function')),
+    # so the map can be keyed without importing Pygments at startup
     try:
         color_map = {
-            Token.Keyword: curses.color_pair(1),
-            Token.Name.Function: curses.color_pair(2),
-            Token.Name.Class: curses.color_pair(3),
-            Token.String: curses.color_pair(4),
-            Token.Comment: curses.color_pair(5),
-            Token.Number: curses.color_pair(6),
-        } if PYGMENTS else {}
+            ('Keyword',): curses.color_pair(1),
+            ('Name', 'Function'): curses.color_pair(2),
+            ('Name', 'Class'): curses.color_pair(3),
+            ('Literal', 'String'): curses.color_pair(4),
+            ('Comment',): curses.color_pair(5),
+            ('Literal', 'Number'): curses.color_pair(6),
+        }
     except Exception:
         color_map = {}
+    _COLOR_CACHE.clear(); _TOKEN_CACHE.clear()  # cached runs hold resolved attrs
     return color_map
 
+# Fixed UI attributes, looked up once by init_ui_attrs() instead of per row/frame
+UI_ATTR: dict = {}
+
+def init_ui_attrs():
+    try: pair = curses.color_pair if curses.has_colors() else (lambda n: curses.A_NORMAL)
+    except Exception: pair = lambda n: curses.A_NORMAL
+    UI_ATTR.update(select=curses.A_REVERSE, status=pair(12), prompt=pair(8), note=pair(5),
+                   child_dir=pair(10), child_file=pair(8))
+
+def row_changed(win, shadow: list, r: int, key, x: int, w: int) -> bool:
+    """Compare row r with the previous frame; blank it and remember key if it differs"""
+    if shadow[r] == key: return False
+    shadow[r] = key
+    try: win.addnstr(r, x, " " * w, w)
+    except Exception: pass
+    return True
+
 def draw_browser(win, st: State, leftw: int, height: int, sel_attr):
-    # Clear entire browser area first
+    if len(st._shadow_browser) != height: st._shadow_browser = [None] * height
+    shadow = st._shadow_browser
+    labels, colors, sel = st.names_display, st.colors, st.selected
     for r in range(height):
-        try: win.addnstr(r, 0, " "*(leftw-1), leftw-1)
+        idx = st.top + r
+        if idx >= len(labels):
+            row_changed(win, shadow, r, "", 0, leftw-1); continue
+        attr = sel_attr if idx == sel else colors[idx]
+        if row_changed(win, shadow, r, (labels[idx], attr), 0, leftw-1):
+            clipped_add(win, r, 0, labels[idx], leftw-1, attr)
+
+@functools.lru_cache(maxsize=16)
+def make_renderer(total_lines: int, ncols: int):
+    """Row painters specialised for one file length and pane width, so the row loop does no layout math"""
+    lineno_w = len(str(total_lines)) + 2
+    content_w = ncols - lineno_w
+    fmt = f"%{lineno_w-1}d ".__mod__
+    lineno_attr = curses.color_pair(5)
+    def gutter(win, y, x, ln):
+        try: win.addnstr(y, x, fmt(ln), lineno_w, lineno_attr)
         except Exception: pass
-    
-    visible = st.entries[st.top:st.top+height]
-    for i,entry in enumerate(visible):
-        idx = st.top + i
-        emo = emoji_for(entry)
-        name = entry.name + ('/' if entry.is_dir() else '')
-        disp = f"{emo} {name}"
-        attr = sel_attr if idx == st.selected else (curses.color_pair(3) if entry.is_dir() else curses.color_pair(0))
-        clipped_add(win, i, 0, disp, leftw-1, attr)
-
-def render_text_preview(win, y, x, path: Path, content: str, cmap, nlines, ncols, scroll=0, sel_line=None, sel_range=None):
-    lines = content.splitlines()
-    lineno_w = len(str(len(lines))) + 2
+    def draw_row(win, y, x, ln, text, attr):
+        gutter(win, y, x, ln)
+        clipped_add(win, y, x+lineno_w, text, content_w, attr)
+    return lineno_w, content_w, gutter, draw_row
+
+def render_text_preview(win, y, x, path: Path, content: str, cmap, nlines, ncols, scroll=0, sel_line=None, sel_range=None, lines=None, shadow=None):
+    if lines is None: lines = content.splitlines()
+    lineno_w, content_w, gutter, draw_row = make_renderer(len(lines), ncols)
     sel_low, sel_high = (None, None) if not sel_range else (min(sel_range), max(sel_range))
+    # content joins the key: an edit above the viewport can recolour unchanged rows (a string
+    # opened there). The same cached text compares by identity, so this costs no scan.
+    key_base = (str(path), content, lineno_w, ncols)
+    view = lines[scroll:scroll+nlines]
+    # 1 for rows inside the visual selection, filled with one slice assignment
+    sel_mask = bytearray(len(view))
+    if sel_low is not None:
+        lo = max(0, sel_low - scroll - 1); hi = min(len(view), sel_high - scroll)
+        if hi > lo: sel_mask[lo:hi] = b'\x01' * (hi - lo)
     # Non-pygments simple rendering — use A_REVERSE for selection/cursor for simple inverted style
-    if not PYGMENTS:
-        for r, line in enumerate(lines[scroll:scroll+nlines]):
+    if not load_pygments():
+        for r, line in enumerate(view):
             ln = scroll + r + 1
-            sel = (sel_low is not None and sel_low <= ln <= sel_high)
+            sel = sel_mask[r]
             single = (ln == sel_line and not sel)
-            try: win.addnstr(y+r, x, f"{ln:>{lineno_w-1}} ", lineno_w, curses.color_pair(5))
-            except Exception: pass
+            if shadow is not None and not row_changed(win, shadow, y+r, (key_base, ln, line, sel, single), x, ncols+1): continue
             # Use A_REVERSE for both visual selection and single line cursor
             attr = curses.A_REVERSE | (curses.A_BOLD if sel else 0) if (sel or single) else curses.A_NORMAL
-            clipped_add(win, y+r, x+lineno_w, line, ncols-lineno_w, attr)
+            draw_row(win, y+r, x, ln, line, attr)
         return
-    try:
-        lexer = guess_lexer_for_filename(str(path), content)
-    except Exception:
-        lexer = TextLexer()
-    for r, line in enumerate(lines[scroll:scroll+nlines]):
+    try: tokens = line_tokens(path, content, cmap)
+    except Exception: tokens = None
+    for r, line in enumerate(view):
         ln = scroll + r + 1
         cx = x + lineno_w
-        try: win.addnstr(y+r, x, f"{ln:>{lineno_w-1}} ", lineno_w, curses.color_pair(5))
-        except Exception: pass
-        if sel_low and sel_low <= ln <= sel_high:
+        sel = sel_mask[r]
+        if shadow is not None and not row_changed(win, shadow, y+r, (key_base, ln, line, sel, sel_line == ln), x, ncols+1): continue
+        # selected/cursor lines use a solid attribute and never touch the token cache
+        if sel:
             # visual selection range -> inverted + bold
-            clipped_add(win, y+r, cx, line, ncols-lineno_w, curses.A_REVERSE | curses.A_BOLD); continue
+            draw_row(win, y+r, x, ln, line, curses.A_REVERSE | curses.A_BOLD); continue
         if sel_line == ln:
             # current single line -> inverted
-            clipped_add(win, y+r, cx, line, ncols-lineno_w, curses.A_REVERSE); continue
+            draw_row(win, y+r, x, ln, line, curses.A_REVERSE); continue
+        gutter(win, y+r, x, ln)
         try:
-            for ttype, val in lex(line, lexer):
-                parent = ttype
-                while parent != Token and parent not in cmap:
-                    parent = parent.parent
-                color = cmap.get(parent, curses.A_NORMAL)
-                for ch in val:
-                    if (cx - x - lineno_w) >= (ncols - lineno_w): break
-                    try: win.addnstr(y+r, cx, ch, 1, color)
-                    except Exception: pass
-                    cx += 1
+            runs = line_runs(tokens, ln-1, cmap) if tokens else None
+            for attr, val in (runs if runs is not None else [(curses.A_NORMAL, line)]):
+                remaining = ncols - (cx - x)
+                if remaining <= 0: break
+                # pane is blanked before drawing, so leading whitespace only advances the cursor
+                if attr is None: cx += len(val); continue
+                # one width scan per run; only a run that overflows the pane is cut and re-measured
+                vw = display_width(val)
+                if vw > remaining: val = truncate_to(val, remaining); vw = display_width(val)
+                try: win.addnstr(y+r, cx, val, remaining, attr)
+                except Exception: pass
+                cx += vw
         except Exception:
-            clipped_add(win, y+r, cx, line, ncols-lineno_w)
+            clipped_add(win, y+r, cx, line, content_w)
 
 def draw_preview(win, st: State, leftw:int, width:int, height:int, cmap):
     sx = leftw
-    w = max(10, width - leftw)
-    for r in range(height):
-        try: win.addnstr(r, sx, " " * (w), w)
-        except Exception: pass
-    for y in range(height):
-        try: win.addch(y, leftw-1, "|")
-        except Exception: pass
-    if st.show_output and st.last_output:
-        lines = st.last_output.splitlines()[st.out_scroll:st.out_scroll+height-1]
-        for i,l in enumerate(lines): clipped_add(win, i, sx, l, w-1)
-        clipped_add(win, height-1, sx, "(press 'o' to hide output)", w-1)
-        return
+    w = st.preview_w
+    if len(st._shadow_preview) != height: st._shadow_preview = [None] * height
+    shadow = st._shadow_preview
+    try: win.vline(0, leftw-1, ord("|"), height)  # separator in one call
+    except Exception: pass
+    def put(r, txt, attr=curses.A_NORMAL):
+        if row_changed(win, shadow, r, (txt, attr), sx, w): clipped_add(win, r, sx, txt, w-1, attr)
+    used = 1
     sel = st.selected_path()
-    if not sel:
-        clipped_add(win, 0, sx, "<empty>", w-1); return
-    if sel.is_dir():
-        clipped_add(win, 0, sx, "<directory>", w-1)
+    if st.show_output and st.last_output:
+        lines = st.output_lines()[st.out_scroll:st.out_scroll+height-1]
+        for i,l in enumerate(lines): put(i, l)
+        put(height-1, "(press 'o' to hide output)"); used = height
+    elif not sel:
+        put(0, "<empty>")
+    elif st.is_dir[st.selected]:
+        put(0, "<directory>")
         try:
-            items = sorted(list(sel.iterdir()), key=lambda p:(not p.is_dir(), p.name.lower()))
-            for i,child in enumerate(items[:height-1]):
-                name = f"{emoji_for(child)} {child.name}{'/' if child.is_dir() else ''}"
-                clipped_add(win, i+1, sx, name, w-1, curses.color_pair(10) if child.is_dir() else curses.color_pair(8))
+            items = st.dir_labels(sel)
+            if items is None:
+                # still being listed in the background; the main loop redraws when it lands
+                put(1, "loading...", UI_ATTR["note"]); used = 2
+            else:
+                for i,(name, is_dir) in enumerate(items[:height-1]):
+                    put(i+1, name, UI_ATTR["child_dir"] if is_dir else UI_ATTR["child_file"])
+                used = 1 + min(len(items), height-1)
         except Exception as e:
-            clipped_add(win, 1, sx, f"[cannot list: {e}]", w-1)
+            put(1, f"[cannot list: {e}]"); used = 2
+    elif not st.selected_is_text():
+        put(0, "[binary/non-text]", UI_ATTR["note"])
     else:
-        if not is_text_file(sel):
-            clipped_add(win, 0, sx, "[binary/non-text]", w-1, curses.color_pair(5)); return
-        txt = safe_read(sel)
-        sel_in_view = st.preview_line if st.preview_line and (st.preview_line-1 >= st.preview_scroll) else None
-        sel_range = (st.sel_start, st.sel_end) if st.sel_start and st.sel_end else None
-        render_text_preview(win, 0, sx, sel, txt, cmap or {}, height-1, w-1, scroll=st.preview_scroll, sel_line=sel_in_view, sel_range=sel_range)
+        res = st.preview_text(sel, IO_WAIT)
+        if res is None:
+            # still being read in the background; the main loop redraws when it lands
+            put(0, "loading...", UI_ATTR["note"])
+        else:
+            txt, lines = res
+            sel_in_view = st.preview_line if st.preview_line and (st.preview_line-1 >= st.preview_scroll) else None
+            sel_range = (st.sel_start, st.sel_end) if st.sel_start and st.sel_end else None
+            render_text_preview(win, 0, sx, sel, txt, cmap or {}, height-1, w-1, scroll=st.preview_scroll, sel_line=sel_in_view, sel_range=sel_range, lines=lines, shadow=shadow)
+            used = len(lines[st.preview_scroll:st.preview_scroll+height-1])
+    # blank whatever the previous frame left below the content
+    for r in range(used, height): row_changed(win, shadow, r, "", sx, w)
+
+def prompt_text(st: State) -> str:
+    if st.mode == "prompt": return "> " + st.input_text()
+    if st.mode == "fuzzy": return f"{st.search_mode}> " + st.input_text()
+    return "> (':' prompt, q quit, o toggles, v visual, Esc cancel)"
 
 def draw_status(win, st: State, width:int, height:int):
     try:
-        clipped_add(win, height-2, 0, f"{st.cwd.name} -> {st.status}"[:width-1], width-1, curses.color_pair(12))
-        if st.mode == "prompt": prompt = "> " + st.input_buf
-        elif st.mode == "fuzzy": prompt = f"{st.search_mode}> " + st.input_buf
-        else: prompt = "> (':' prompt, q quit, o toggles, v visual, Esc cancel)"
-        clipped_add(win, height-1, 0, prompt[:width-1], width-1, curses.color_pair(8))
-        if st.mode in ("prompt","fuzzy"):
+        shadow = st._shadow_status
+        # rows are only rebuilt when a status attribute changed; otherwise this call just parks the cursor
+        if st.dirty & DIRTY_STATUS:
+            # each row is cleared and rewritten only when its text changed since the last frame
+            for i, (text, attr) in enumerate(((f"{st.cwd.name} -> {st.status}"[:width-1], UI_ATTR["status"]),
+                                              (prompt_text(st)[:width-1], UI_ATTR["prompt"]))):
+                if shadow[i] == text: continue
+                shadow[i] = text; r = height-2+i
+                win.move(r, 0); win.clrtoeol()
+                clipped_add(win, r, 0, text, width-1, attr)
+        prompt = shadow[1] or ""
+        typing = st.mode in ("prompt","fuzzy")
+        if typing != st.cursor_visible:
+            try: curses.curs_set(1 if typing else 0)
+            except Exception: pass
+            st.cursor_visible = typing
+        if typing:
             try: win.move(height-1, min(len(prompt), width-1))
             except Exception: pass
     except Exception:
@@ -509,6 +1196,36 @@ def unique_dest(p: Path):
         if not cand.exists(): return cand
         i += 1
 
+def _raise(e): raise e
+
+def copy_tree(src, dst):
+    """shutil.copytree with the file copies spread over a thread pool. copy2 already takes the
+    kernel's zero-copy path per file; trees of many small files are bound by per-file latency."""
+    src, dst = os.fspath(src), os.fspath(dst); made = []
+    with ThreadPoolExecutor(IO_WORKERS) as ex:
+        jobs = []
+        # like copytree(symlinks=False): linked files and directories are copied as their targets
+        for top, _, files in os.walk(src, onerror=_raise, followlinks=True):
+            out = os.path.normpath(os.path.join(dst, os.path.relpath(top, src)))
+            os.makedirs(out); made.append((top, out))
+            jobs += [ex.submit(shutil.copy2, os.path.join(top, f), os.path.join(out, f)) for f in files]
+        for j in jobs: j.result()  # surface the first failed copy
+    # directory modes and times go on last, deepest first: a read-only source directory would
+    # otherwise lock its copy before the pool had written into it
+    for top, out in reversed(made): shutil.copystat(top, out)
+
+def move_path(src, dst) -> str:
+    """shutil.move for the common same-filesystem case: one isdir() and one rename(2).
+    Anything rename refuses (another device, an existing target on Windows) goes to shutil.move."""
+    src, dst = os.fspath(src), os.fspath(dst)
+    real = os.path.join(dst, os.path.basename(src.rstrip(os.sep))) if os.path.isdir(dst) else dst
+    # like shutil.move, never replace an entry inside a target directory
+    if real != dst and os.path.lexists(real): return shutil.move(src, dst)
+    try: os.rename(src, real)
+    except FileNotFoundError: raise
+    except OSError: return shutil.move(src, dst)
+    return real
+
 def perform_paste(st: State):
     if not st.clipboard_path or not st.clipboard_action: return False, "nothing to paste"
     src = Path(st.clipboard_path)
@@ -517,14 +1234,14 @@ def perform_paste(st: State):
     if st.clipboard_action == "copy":
         dst = unique_dest(dst)
         try:
-            if src.is_dir(): shutil.copytree(src, dst)
+            if src.is_dir(): copy_tree(src, dst)
             else: shutil.copy2(src, dst)
             return True, f"copied to {dst.name}"
         except Exception as e: return False, f"copy failed: {e}"
     if st.clipboard_action == "move":
         dst = unique_dest(dst)
         try:
-            shutil.move(str(src), str(dst))
+            move_path(src, dst)
             st.clipboard_path = st.clipboard_action = None
             return True, f"moved to {dst.name}"
         except Exception as e: return False, f"move failed: {e}"
@@ -532,12 +1249,13 @@ def perform_paste(st: State):
 
 def copy_selection_to_clipboard(st: State):
     sp = st.selected_path()
-    if not sp or not sp.is_file() or not is_text_file(sp): return False, "no text file selected"
+    if not st.selected_is_text(): return False, "no text file selected"
     s,e = st.sel_start, st.sel_end
     if s is None or e is None: return False, "no selection"
-    txt = safe_read(sp)
-    lines = txt.splitlines()
-    selected = "\n".join(lines[s-1:e])
+    # the lines come from the preview cache the pane was drawn from, so copying does no I/O;
+    # the range is ordered like the highlight, whichever end the selection was started from
+    s, e = min(s, e), max(s, e)
+    selected = "\n".join(st.preview_text(sp)[1][s-1:e])
     ok, info = write_clipboard(selected)
     return ok, info
 
@@ -548,7 +1266,7 @@ def open_shell_same_window(stdscr, path: Path):
         try: curses.endwin()
         except Exception: pass
         # Prefer powershell.exe; run interactive shell in cwd
-        exe = shutil.which("powershell.exe") or shutil.which("pwsh") or shutil.which("powershell")
+        exe = which("powershell.exe") or which("pwsh") or which("powershell")
         if exe:
             # Launch interactive PowerShell in the given cwd. Do not use -NoExit: we want user to interact and exit to return to the app.
             subprocess.run([exe], cwd=str(path))
@@ -558,15 +1276,15 @@ def open_shell_same_window(stdscr, path: Path):
     except Exception as e:
         log_exc(e)
     finally:
-        try: curses.doupdate(); stdscr.refresh()
+        try: stdscr.noutrefresh(); curses.doupdate()
         except Exception: pass
 
 def open_shell_new_window(stdscr, path: Path):
     """Open PowerShell in a new Windows Terminal window (non-blocking if possible)."""
     try:
         # Prefer Windows Terminal 'wt' which supports -d for directory
-        wt = shutil.which("wt")
-        pwsh = shutil.which("pwsh") or shutil.which("powershell.exe") or shutil.which("powershell")
+        wt = which("wt")
+        pwsh = which("pwsh") or which("powershell.exe") or which("powershell")
         if wt:
             # Open new Windows Terminal tab/window with PowerShell in the directory.
             # Using 'new-window' isn't necessary; 'wt -d <dir> powershell' opens a new window.
@@ -587,7 +1305,7 @@ def open_shell_new_window(stdscr, path: Path):
     except Exception as e:
         log_exc(e)
     finally:
-        try: curses.doupdate(); stdscr.refresh()
+        try: stdscr.noutrefresh(); curses.doupdate()
         except Exception: pass
 
 def open_explorer(path: Path):
@@ -600,40 +1318,142 @@ def open_explorer(path: Path):
                 subprocess.Popen(["explorer", str(path)])
         else:
             # cross-platform fallback: try xdg-open / open
-            opener = shutil.which("xdg-open") or shutil.which("open")
+            opener = which("xdg-open") or which("open")
             if opener:
                 subprocess.Popen([opener, str(path)])
     except Exception as e:
         log_exc(e)
 
 # Keys handling
+def enter_dir(st: State, target: Path):
+    # Remember current selection before changing directory
+    current_sel = st.selected_path()
+    if current_sel:
+        st.dir_history[str(st.cwd)] = current_sel.name
+    
+    old_cwd = st.cwd
+    st.cwd = target.resolve()
+    
+    # If going to parent, remember which child we came from
+    remember_child = old_cwd if target == old_cwd.parent else None
+    st.reload(remember_child=remember_child)
+    
+    st.status = f"cd -> {st.cwd}"
+    # reload() invalidates the pane shadows, so the next frame repaints every row
+
+# Browser key actions, dispatched through BROWSER_KEYS: fn(st, sel, h, stdscr) -> "quit" | None
+def key_up(st, sel, h, stdscr):
+    st.selected = max(0, st.selected - 1)
+    if st.selected < st.top + 5: st.top = max(0, st.selected - 5)
+    st.preview_scroll = 0; st.preview_line = None; st.selection_mode=False
+
+def key_down(st, sel, h, stdscr):
+    st.selected = min(st.entry_count-1, st.selected + 1)
+    if st.selected >= st.top + (h-2) - 5: st.top = st.selected - (h-2) + 5
+    st.preview_scroll = 0; st.preview_line = None; st.selection_mode=False
+
+def key_parent(st, sel, h, stdscr):
+    parent = st.cwd.parent
+    if parent != st.cwd:
+        try: enter_dir(st, parent)
+        except Exception: st.status = "Cannot go parent"
+
+def key_open(st, sel, h, stdscr):
+    if not sel: return None
+    if st.is_dir[st.selected]:
+        try: enter_dir(st, sel)
+        except Exception: st.status = "Cannot enter"
+    else:
+        st.status = f"Opening {sel.name}..."; open_in_editor_safe(stdscr, sel); st.status = "Ready"
+
+def key_prompt(st, sel, h, stdscr):
+    st.mode = "prompt"; st.clear_input()
+
+def key_toggle_output(st, sel, h, stdscr):
+    st.show_output = not st.show_output
+
+def key_page_down(st, sel, h, stdscr):
+    st.top = min(max(0, st.entry_count-1), st.top + (h-2)//2)
+
+def key_page_up(st, sel, h, stdscr):
+    st.top = max(0, st.top - (h-2)//2)
+
+def key_half_down(st, sel, h, stdscr):
+    if st.show_output and st.last_output:
+        st.out_scroll = min(st.output_max_scroll(), st.out_scroll + (h-2)//2)
+    elif st.selected_is_text():
+        st.preview_scroll = min(st.preview_max_scroll(sel), st.preview_scroll + (h-2)//2)
+
+def key_half_up(st, sel, h, stdscr):
+    if st.show_output and st.last_output:
+        st.out_scroll = max(0, st.out_scroll - (h-2)//2)
+    elif st.selected_is_text():
+        st.preview_scroll = max(0, st.preview_scroll - (h-2)//2)
+
+def key_delete(st, sel, h, stdscr):
+    # dd: the first d arms, a second one deletes the selection
+    if st.mode != "maybe_delete": st.mode = "maybe_delete"; st.clear_input(); return
+    st.mode = "browser"
+    if sel:
+        ok,msg = safe_delete(sel)
+        st.reload(); st.status = "deleted" if ok else f"delete failed: {msg}"
+
+def key_yank(st, sel, h, stdscr):
+    st.clipboard_path = str(sel) if sel else None; st.clipboard_action = "copy"; st.status = f"yanked {sel.name if sel else ''}"
+
+def key_mark(st, sel, h, stdscr):
+    st.clipboard_path = str(sel) if sel else None; st.clipboard_action = "move"; st.status = f"marked {sel.name if sel else ''}"
+
+def key_find(st, sel, h, stdscr):
+    st.mode = "fuzzy"; st.clear_input(); st.search_mode = "ff"; st.status = "ff: type to fuzzy-search files"
+
+def key_paste(st, sel, h, stdscr):
+    ok,msg = perform_paste(st); st.status = msg if ok else f"paste failed: {msg}"; st.reload()
+
+def key_quit(st, sel, h, stdscr):
+    return "quit"
+
+# Shift+S -> open shell in same terminal window (PowerShell) at st.cwd
+def key_shell(st, sel, h, stdscr):
+    try:
+        st.status = "Opening PowerShell (same window)..."
+        open_shell_same_window(stdscr, st.cwd)
+        st.status = "Returned from shell"
+    except Exception as e:
+        st.status = f"shell failed: {e}"; log_exc(e)
+
+# 'w' -> open shell in new Windows Terminal window
+def key_shell_window(st, sel, h, stdscr):
+    try:
+        st.status = "Opening PowerShell (new window)..."
+        open_shell_new_window(stdscr, st.cwd)
+        st.status = "Opened new window"
+    except Exception as e:
+        st.status = f"open new shell failed: {e}"; log_exc(e)
+
+# 'e' -> open explorer in current folder
+def key_explorer(st, sel, h, stdscr):
+    try:
+        open_explorer(st.cwd)
+        st.status = "Opened Explorer"
+    except Exception as e:
+        st.status = f"open explorer failed: {e}"; log_exc(e)
+
+KEY_ALIASES = {ord('h'): curses.KEY_LEFT, ord('j'): curses.KEY_DOWN, ord('k'): curses.KEY_UP, ord('l'): curses.KEY_RIGHT}
+BROWSER_KEYS = {
+    curses.KEY_UP: key_up, curses.KEY_DOWN: key_down, curses.KEY_LEFT: key_parent,
+    curses.KEY_RIGHT: key_open, KEY_NL: key_open, ord(':'): key_prompt, ord('p'): key_prompt,
+    ord('o'): key_toggle_output, curses.KEY_NPAGE: key_page_down, curses.KEY_PPAGE: key_page_up,
+    4: key_half_down, 21: key_half_up, ord('d'): key_delete, ord('y'): key_yank, ord('m'): key_mark,
+    ord('f'): key_find, ord('P'): key_paste, KEY_Q: key_quit,
+    ord('S'): key_shell, ord('w'): key_shell_window, ord('e'): key_explorer,
+}
+
 def handle_keys(st: State, key, stdscr, cmap, hist):
-    def enter_dir(target: Path):
-        # Remember current selection before changing directory
-        current_sel = st.selected_path()
-        if current_sel:
-            st.dir_history[str(st.cwd)] = current_sel.name
-        
-        old_cwd = st.cwd
-        st.cwd = target.resolve()
-        
-        # If going to parent, remember which child we came from
-        remember_child = old_cwd if target == old_cwd.parent else None
-        st.reload(remember_child=remember_child)
-        
-        st.status = f"cd -> {st.cwd}"
-        # Force complete redraw on directory change
-        stdscr.clear()
-        stdscr.refresh()
-
-    if key in (ord('h'),): key = curses.KEY_LEFT
-    if key in (ord('j'),): key = curses.KEY_DOWN
-    if key in (ord('k'),): key = curses.KEY_UP
-    if key in (ord('l'),): key = curses.KEY_RIGHT
-
-    if key in (ord('v'), ord('V')):
-        sp = st.selected_path()
-        if not sp or not sp.is_file() or not is_text_file(sp):
+    key = KEY_ALIASES.get(key, key)
+
+    if key in KEYS_VISUAL:
+        if not st.selected_is_text():
             st.status = "Visual only for text files"; return None
         if not st.selection_mode:
             st.selection_mode = True
@@ -645,11 +1465,11 @@ def handle_keys(st: State, key, stdscr, cmap, hist):
             ok,info = copy_selection_to_clipboard(st)
             st.selection_mode = False; st.status = f"Copied ({info})" if ok else f"Copy failed: {info}"; return None
 
-    if key == 27:
+    if key == KEY_ESC:
         if st.selection_mode:
             st.selection_mode = False; st.sel_start = st.sel_end = None; st.status = "Selection cancelled"; return None
         if st.mode in ("prompt","fuzzy"):
-            st.mode = "browser"; st.input_buf = ""; return None
+            st.mode = "browser"; st.clear_input(); return None
         if st.search_mode:
             st.search_mode = None; st.search_results = []; st.search_sel = 0; st.status = "search cancelled"; return None
 
@@ -658,124 +1478,29 @@ def handle_keys(st: State, key, stdscr, cmap, hist):
             st.search_sel = max(0, st.search_sel - 1); st.out_scroll = max(0, st.search_sel); return None
         if key == curses.KEY_DOWN:
             st.search_sel = min(len(st.search_results)-1, st.search_sel + 1); return None
-        if key in (ord("\n"), curses.KEY_RIGHT):
+        if key in (KEY_NL, curses.KEY_RIGHT):
             if st.search_mode == "ff":
                 if not st.search_results: return None
                 target = st.cwd / Path(st.search_results[st.search_sel])
                 if target.exists() and target.is_file():
                     st.cwd = st.cwd.resolve(); st.reload()
-                    for i,p in enumerate(st.entries):
-                        try:
-                            if p.resolve() == target.resolve(): st.selected = i; break
-                        except Exception: pass
+                    i = st.index_of(target.name) if target.parent.resolve() == st.cwd else -1
+                    if i >= 0: st.selected = i
                     st.status = f"Opened {target.name}"; open_in_editor_safe(stdscr, target); st.search_mode=None; st.search_results=[]; return None
             if st.search_mode == "fl":
                 rec = st.search_results[st.search_sel]; target = st.cwd / Path(rec[0]); ln = rec[1]
                 if target.exists():
                     st.cwd = st.cwd.resolve(); st.reload()
-                    for i,p in enumerate(st.entries):
-                        try:
-                            if p.resolve() == target.resolve(): st.selected = i; break
-                        except Exception: pass
+                    i = st.index_of(target.name) if target.parent.resolve() == st.cwd else -1
+                    if i >= 0: st.selected = i
                     st.preview_line = ln; st.preview_scroll = max(0, ln-1); st.search_mode=None; st.search_results=[]; st.status = f"Jumped to {rec[0]}:{ln}"; return None
         return None
 
-    sel = st.selected_path()
-    h = stdscr.getmaxyx()[0] if stdscr else 25
-
-    # New keybindings:
-    # Shift+S -> uppercase 'S' -> open shell in same terminal window (PowerShell) at st.cwd
-    if key == ord('S'):
-        try:
-            st.status = "Opening PowerShell (same window)..."
-            stdscr.refresh()
-            open_shell_same_window(stdscr, st.cwd)
-            st.status = "Returned from shell"
-        except Exception as e:
-            st.status = f"shell failed: {e}"; log_exc(e)
-        return None
-
-    # 'w' -> open shell in new Windows Terminal window
-    if key == ord('w'):
-        try:
-            st.status = "Opening PowerShell (new window)..."
-            stdscr.refresh()
-            open_shell_new_window(stdscr, st.cwd)
-            st.status = "Opened new window"
-        except Exception as e:
-            st.status = f"open new shell failed: {e}"; log_exc(e)
-        return None
-
-    # 'e' -> open explorer in current folder
-    if key == ord('e'):
-        try:
-            open_explorer(st.cwd)
-            st.status = "Opened Explorer"
-        except Exception as e:
-            st.status = f"open explorer failed: {e}"; log_exc(e)
-        return None
-
-    if key == curses.KEY_UP:
-        st.selected = max(0, st.selected - 1)
-        if st.selected < st.top + 5: st.top = max(0, st.selected - 5)
-        st.preview_scroll = 0; st.preview_line = None; st.selection_mode=False; st.force_redraw=True
-    elif key == curses.KEY_DOWN:
-        st.selected = min(len(st.entries)-1, st.selected + 1)
-        if st.selected >= st.top + (h-2) - 5: st.top = st.selected - (h-2) + 5
-        st.preview_scroll = 0; st.preview_line = None; st.selection_mode=False; st.force_redraw=True
-    elif key == curses.KEY_LEFT:
-        parent = st.cwd.parent
-        if parent != st.cwd:
-            try: enter_dir(parent)
-            except Exception: st.status = "Cannot go parent"
-    elif key == curses.KEY_RIGHT or key == ord("\n"):
-        if not sel: return None
-        if sel.is_dir():
-            try: enter_dir(sel)
-            except Exception: st.status = "Cannot enter"
-        else:
-            st.status = f"Opening {sel.name}..."; open_in_editor_safe(stdscr, sel); st.status = "Ready"
-    elif key == ord(':') or key == ord('p'):
-        st.mode = "prompt"; st.input_buf = ""
-    elif key == ord('o'):
-        st.show_output = not st.show_output
-    elif key == curses.KEY_NPAGE:
-        st.top = min(max(0, len(st.entries)-1), st.top + (h-2)//2); st.force_redraw=True
-    elif key == curses.KEY_PPAGE:
-        st.top = max(0, st.top - (h-2)//2); st.force_redraw=True
-    elif key == 4:
-        if st.show_output and st.last_output:
-            st.out_scroll = min(max(0, len(st.last_output.splitlines())-(h-2)), st.out_scroll + (h-2)//2)
-        elif sel and sel.is_file() and is_text_file(sel):
-            txt_lines = safe_read(sel).splitlines(); st.preview_scroll = min(max(0, len(txt_lines)-(h-2)), st.preview_scroll + (h-2)//2)
-    elif key == 21:
-        if st.show_output and st.last_output:
-            st.out_scroll = max(0, st.out_scroll - (h-2)//2)
-        elif sel and sel.is_file() and is_text_file(sel):
-            st.preview_scroll = max(0, st.preview_scroll - (h-2)//2)
-    elif key == ord('d'):
-        st.mode = "maybe_delete"; st.input_buf = ""
-    elif key == ord('y'):
-        st.clipboard_path = str(sel) if sel else None; st.clipboard_action = "copy"; st.status = f"yanked {sel.name if sel else ''}"
-    elif key == ord('m'):
-        st.clipboard_path = str(sel) if sel else None; st.clipboard_action = "move"; st.status = f"marked {sel.name if sel else ''}"
-    elif key == ord('f'):
-        st.mode = "fuzzy"; st.input_buf = ""; st.search_mode = "ff"; st.status = "ff: type to fuzzy-search files"
-    elif key == ord('P'):
-        ok,msg = perform_paste(st); st.status = msg if ok else f"paste failed: {msg}"; st.reload()
-    elif key == ord('q'):
-        return "quit"
-    elif key == 9:
-        return None
-    else:
-        if getattr(st, 'mode', None) == "maybe_delete" and key == ord('d'):
-            if sel:
-                ok,msg = safe_delete(sel)
-                st.reload(); st.status = "deleted" if ok else f"delete failed: {msg}"
-            st.mode = "browser"
-        else:
-            return None
-    return None
+    fn = BROWSER_KEYS.get(key)
+    # any other key disarms a pending dd
+    if st.mode == "maybe_delete" and fn is not key_delete: st.mode = "browser"
+    if fn is None: return None
+    return fn(st, st.selected_path(), st.height or 25, stdscr)
 
 def safe_delete(p: Path):
     try:
@@ -793,7 +1518,7 @@ def open_in_editor_safe(stdscr, path: Path):
     except Exception: pass
     opened = False
     try:
-        exe = shutil.which("nvim") or shutil.which("vim") or shutil.which("code") or shutil.which("subl") or shutil.which("nano")
+        exe = which("nvim") or which("vim") or which("code") or which("subl") or which("nano")
         if exe:
             subprocess.run([exe, str(path)])
             opened = True
@@ -804,98 +1529,174 @@ def open_in_editor_safe(stdscr, path: Path):
             editor = os.environ.get("EDITOR")
             if editor: subprocess.run([editor, str(path)]); opened = True
             else:
-                opener = shutil.which("xdg-open") or shutil.which("open")
+                opener = which("xdg-open") or which("open")
                 if opener: subprocess.run([opener, str(path)]); opened = True
     except Exception:
         opened = False
     finally:
-        try: curses.doupdate(); stdscr.refresh()
+        try: stdscr.noutrefresh(); curses.doupdate()
         except Exception: pass
     return opened
 
+# Prompt commands: name -> (fn(st, args) -> "quit" | None, required len(args) or None for any)
+def cmd_catlsr(st, args):
+    st.last_output = generate_catlsr(st.cwd); st.show_output = True; st.status = "[catlsr]"
+    ok, info = write_clipboard(st.last_output)
+    if ok: st.status += f" (copied via {info})"
+
+def cmd_cd(st, args):
+    arg = " ".join(args[1:]) or os.path.expanduser("~")
+    # lexical normalisation only: no per-component lstat like resolve()
+    nd = Path(os.path.normpath(os.path.join(str(st.cwd), arg)))
+    if os.path.isdir(nd): st.cwd = nd; st.reload(); st.status = f"cd -> {st.cwd}"
+    else: st.status = f"Not a dir: {nd}"
+
+def cmd_ls(st, args):
+    st.reload(); st.status = "ls"
+
+# Mutating commands just try the operation (no exists() stat first); only a failure
+# pays for the lexists() that tells a missing source from any other error.
+# Their paths are plain normalised strings joined onto cwd once, not Path objects.
+def cmd_rename(st, args):
+    cwd = os.fspath(st.cwd); s = os.path.normpath(os.path.join(cwd, args[1])); d = os.path.normpath(os.path.join(cwd, args[2]))
+    sn, dn = os.path.basename(s), os.path.basename(d)
+    # a renamed selection stays selected under its new name
+    was_sel = st.index_of(sn) == st.selected
+    # replace, not rename: an existing target is overwritten the same way on POSIX and Windows
+    try: os.replace(s, d)
+    except FileNotFoundError:
+        if os.path.lexists(s): raise
+        st.status = "Source does not exist."; return
+    st.drop_entry(s); st.add_entry(d, select=was_sel); st.status = f"Renamed {sn} -> {dn}"
+
+def cmd_mkdir(st, args):
+    os.mkdir(os.path.join(os.fspath(st.cwd), args[1])); st.add_entry(args[1]); st.status = f"mkdir {args[1]}"
+
+def cmd_touch(st, args):
+    # Path.touch(exist_ok=False) without the Path: create-exclusive, then close
+    os.close(os.open(os.path.join(os.fspath(st.cwd), args[1]), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)); st.add_entry(args[1]); st.status = f"touch {args[1]}"
+
+def cmd_duplicate(st, args):
+    s = os.path.normpath(os.path.join(os.fspath(st.cwd), args[1]))
+    try: isdir = stat.S_ISDIR(os.stat(s).st_mode)
+    except FileNotFoundError: st.status = "Source not found"; return
+    dst = unique_dest(st.cwd / os.path.basename(s))
+    if isdir: copy_tree(s, dst)
+    else: shutil.copy2(s, dst)
+    st.add_entry(dst); st.status = f"Duplicated {args[1]}"
+
+def cmd_chmod(st, args):
+    os.chmod(os.path.join(os.fspath(st.cwd), args[2]), int(args[1], 8)); st.status = f"chmod {args[1]} {args[2]}"
+
+def cmd_cat(st, args):
+    # normalised like the browser's entry paths, so it hits the same preview cache key
+    p = os.path.normpath(os.path.join(os.fspath(st.cwd), args[1]))
+    if os.path.exists(p):
+        # the preview cache usually holds this file already; a miss is read in the background
+        # and shown by collect_io. A newer :cat supersedes one still loading.
+        st._io_pending.pop("cat", None)
+        res = st.preview_text(p, IO_WAIT, kind="cat")
+        if res: st.show_file(p, *res)
+        elif "cat" in st._io_pending: st.status = f"Loading {args[1]}..."
+    else: st.status = "File does not exist."
+
+def cmd_move(st, args):
+    cwd = os.fspath(st.cwd); s = os.path.normpath(os.path.join(cwd, args[1])); d = os.path.normpath(os.path.join(cwd, args[2]))
+    try: dst = move_path(s, d)
+    except FileNotFoundError:
+        if os.path.lexists(s): raise
+        st.status = "Source does not exist."; return
+    st.drop_entry(s); st.add_entry(dst); st.status = f"Moved {args[1]}"
+
+def cmd_quit(st, args):
+    return "quit"
+
+def cmd_help(st, args):
+    st.status = HELP_MSG
+
+PROMPT_COMMANDS = {
+    "catlsr": (cmd_catlsr, None), "cd": (cmd_cd, None), "ls": (cmd_ls, None), "rename": (cmd_rename, 3),
+    "mkdir": (cmd_mkdir, 2), "touch": (cmd_touch, 2), "duplicate": (cmd_duplicate, 2), "chmod": (cmd_chmod, 3),
+    "cat": (cmd_cat, 2), "move": (cmd_move, 3), "exit": (cmd_quit, None), "quit": (cmd_quit, None), "help": (cmd_help, None),
+}
+
+def prompt_submit(st: State):
+    cmd = st.input_text().strip(); args = cmd.split()
+    if not args: st.mode = "browser"; st.clear_input(); return None
+    try:
+        spec = PROMPT_COMMANDS.get(args[0])
+        if spec and (spec[1] is None or len(args) == spec[1]):
+            if spec[0](st, args) == "quit": return "quit"
+        else:
+            st.status = f"Unknown: {cmd}"
+    except Exception as e:
+        st.status = f"Error: {e}"; log_exc(e)
+    st.mode = "browser"; st.clear_input(); return None
+
+def fuzzy_submit(st: State):
+    q = st.input_text().strip()
+    if st.search_mode == "ff":
+        st.search_results = search_files(st.cwd, q); st.search_mode = "ff"; st.mode = "browser"; st.status = f"ff results: {len(st.search_results)}"
+    elif st.search_mode == "fl":
+        st.search_results = search_lines(st.cwd, q); st.search_mode = "fl"; st.mode = "browser"; st.status = f"fl results: {len(st.search_results)}"
+    st.clear_input()
+
+def prompt_cancel(st: State):
+    st.mode = "browser"; st.clear_input()
+
+def fuzzy_cancel(st: State):
+    st.mode = "browser"; st.clear_input(); st.search_mode = None
+
+# Prompt keys per mode: key -> fn(st) -> "quit" | None; any other key is a line edit (State.input_key)
+PROMPT_KEYS = {
+    "prompt": {curses.KEY_ENTER: prompt_submit, KEY_NL: prompt_submit, KEY_ESC: prompt_cancel},
+    "fuzzy": {curses.KEY_ENTER: fuzzy_submit, KEY_NL: fuzzy_submit, KEY_ESC: fuzzy_cancel},
+}
+
 def handle_prompt(st: State, key):
-    if st.mode == "fuzzy":
-        if key in (curses.KEY_ENTER, ord("\n")):
-            q = st.input_buf.strip()
-            if st.search_mode == "ff":
-                st.search_results = search_files(st.cwd, q); st.search_mode = "ff"; st.mode = "browser"; st.status = f"ff results: {len(st.search_results)}"
-            elif st.search_mode == "fl":
-                st.search_results = search_lines(st.cwd, q); st.search_mode = "fl"; st.mode = "browser"; st.status = f"fl results: {len(st.search_results)}"
-            st.input_buf = ""; return None
-        if key in (curses.KEY_BACKSPACE, 127):
-            st.input_buf = st.input_buf[:-1]; return None
-        if 32 <= key < 127:
-            st.input_buf += chr(key); return None
-        if key == 27:
-            st.mode = "browser"; st.input_buf = ""; st.search_mode = None; return None
-        return None
+    fn = PROMPT_KEYS[st.mode].get(key)
+    if fn: return fn(st)
+    st.input_key(key); return None
 
-    if key in (curses.KEY_ENTER, ord("\n")):
-        cmd = st.input_buf.strip(); args = cmd.split()
-        if not args: st.mode = "browser"; st.input_buf = ""; return None
+def read_body(fp: str) -> str:
+    try:
+        with open(fp, encoding='utf-8', errors='replace') as fh: return fh.read()
+    except Exception: return ""
+
+def read_text_file(fp: str):
+    """read_body for text files, None for binary ones"""
+    return read_body(fp) if is_text_file(fp) else None
+
+def read_ahead(files, read=read_body):
+    """Yield (rel, read(path)) for (rel, path) pairs in order. Reads are I/O-bound, so a thread pool
+    runs a bounded window of them ahead of the one being consumed, READ_BATCH files per task:
+    one future per small file would cost more than a warm-cache read."""
+    def job(batch): return [(rel, read(fp)) for rel, fp in batch]
+    ahead = deque(); batch = []
+    with ThreadPoolExecutor(IO_WORKERS) as ex:
         try:
-            if args[0] == "catlsr":
-                st.last_output = generate_catlsr(st.cwd); st.show_output = True; st.status = "[catlsr]"
-                ok, info = write_clipboard(st.last_output)
-                if ok: st.status += f" (copied via {info})"
-            elif args[0] == "cd":
-                arg = " ".join(args[1:]) or os.path.expanduser("~")
-                nd = (st.cwd / arg).resolve() if not Path(arg).is_absolute() else Path(arg).resolve()
-                if nd.is_dir(): st.cwd = nd; st.reload(); st.status = f"cd -> {st.cwd}"
-                else: st.status = f"Not a dir: {nd}"
-            elif args[0] == "ls":
-                st.reload(); st.status = "ls"
-            elif args[0] == "rename" and len(args) == 3:
-                s = st.cwd / args[1]; d = st.cwd / args[2]
-                if s.exists(): s.rename(d); st.reload(); st.status = f"Renamed {s.name} -> {d.name}"
-                else: st.status = "Source does not exist."
-            elif args[0] == "mkdir" and len(args) == 2:
-                (st.cwd / args[1]).mkdir(exist_ok=False); st.reload(); st.status = f"mkdir {args[1]}"
-            elif args[0] == "touch" and len(args) == 2:
-                (st.cwd / args[1]).touch(exist_ok=False); st.reload(); st.status = f"touch {args[1]}"
-            elif args[0] == "duplicate" and len(args) == 2:
-                s = st.cwd / args[1]
-                if s.exists():
-                    dst = unique_dest(st.cwd / (s.stem + s.suffix))
-                    if s.is_dir(): shutil.copytree(s, dst)
-                    else: shutil.copy2(s, dst)
-                    st.reload(); st.status = f"Duplicated {args[1]}"
-                else: st.status = "Source not found"
-            elif args[0] == "chmod" and len(args) == 3:
-                p = st.cwd / args[2]; p.chmod(int(args[1], 8)); st.status = f"chmod {args[1]} {args[2]}"
-            elif args[0] == "cat" and len(args) == 2:
-                p = st.cwd / args[1]
-                if p.exists(): st.last_output = safe_read(p); st.show_output=True; st.status = f"Showing {args[1]}"
-                else: st.status = "File does not exist."
-            elif args[0] == "move" and len(args) == 3:
-                s = st.cwd / args[1]; d = st.cwd / args[2]
-                if s.exists(): shutil.move(str(s), str(d)); st.reload(); st.status = f"Moved {args[1]}"
-                else: st.status = "Source does not exist."
-            elif args[0] in ("exit", "quit"):
-                return "quit"
-            elif args[0] == "help":
-                st.status = "Commands: cd <path>, ls, catlsr, cat <f>, mkdir, touch, rename, duplicate, chmod, move, quit"
-            else:
-                st.status = f"Unknown: {cmd}"
-        except Exception as e:
-            st.status = f"Error: {e}"; log_exc(e)
-        st.mode = "browser"; st.input_buf = ""; return None
-    if key in (curses.KEY_BACKSPACE, 127): st.input_buf = st.input_buf[:-1]; return None
-    if 32 <= key < 127: st.input_buf += chr(key); return None
-    if key == 27: st.mode = "browser"; st.input_buf = ""; return None
-    return None
+            for pair in files:
+                batch.append(pair)
+                if len(batch) < READ_BATCH: continue
+                ahead.append(ex.submit(job, batch)); batch = []
+                if len(ahead) >= 2 * IO_WORKERS: yield from ahead.popleft().result()
+            if batch: ahead.append(ex.submit(job, batch))
+            while ahead: yield from ahead.popleft().result()
+        finally:
+            for f in ahead: f.cancel()  # a consumer that stopped early skips the queued reads
+
+def iter_catlsr_chunks(root: Path):
+    """Yield the catlsr dump piecewise, in walk order, with the files read ahead on a thread pool"""
+    any_file = False
+    for rel, body in read_ahead(walk_files(root, text_only=False), read_text_file):
+        if body is None: continue
+        any_file = True
+        yield f"{SPLIT}\n{rel}\n{SPLIT}\n"; yield body; yield "\n"
+    if not any_file: yield "[no files found]\n"
+    yield f"{SPLIT}\npreprompt.txt\n{SPLIT}\n{read_preprompt(root)}\n"
 
 def generate_catlsr(root: Path):
-    buf = io.StringIO(); any_file=False
-    for rel in walk_files(root):
-        any_file = True
-        buf.write(f"{SPLIT}\n{rel}\n{SPLIT}\n")
-        try: buf.write((root/rel).read_text(errors='replace'))
-        except Exception: pass
-        buf.write("\n")
-    if not any_file: buf.write("[no files found]\n")
-    buf.write(f"{SPLIT}\npreprompt.txt\n{SPLIT}\n{read_preprompt(root)}\n")
-    return buf.getvalue()
+    return "".join(iter_catlsr_chunks(root))
 
 def read_preprompt(root: Path):
     p = root / "preprompt.txt"
@@ -906,78 +1707,159 @@ def read_preprompt(root: Path):
             return "please analyze this project, add tell how to possibly extend it\n"
     return "please analyze this project, add tell how to possibly extend it\n"
 
+def wheel_burst(stdscr, leftw: int):
+    """Collect further wheel events over the preview pane arriving within WHEEL_WINDOW; returns their summed delta"""
+    delta = 0; end = time.monotonic() + WHEEL_WINDOW
+    try:
+        while True:
+            left = end - time.monotonic()
+            if left <= 0: break
+            stdscr.timeout(max(1, int(left * 1000)))
+            c = stdscr.getch()
+            if c == -1: break
+            if c != curses.KEY_MOUSE: curses.ungetch(c); break
+            ev = curses.getmouse(); b = ev[4]
+            if ev[1] < leftw or not b & (curses.BUTTON4_PRESSED | curses.BUTTON5_PRESSED):
+                # anything else goes back on the queue for the main loop
+                curses.ungetmouse(*ev); break
+            delta += -WHEEL_STEP if b & curses.BUTTON4_PRESSED else WHEEL_STEP
+    except Exception:
+        pass
+    finally:
+        stdscr.timeout(-1)
+    return delta
+
+def input_pending(stdscr) -> bool:
+    """True when a key is already queued; the key is pushed back for the next getch"""
+    stdscr.timeout(0)
+    try: c = stdscr.getch()
+    except Exception: c = -1
+    finally: stdscr.timeout(-1)
+    if c == -1: return False
+    curses.ungetch(c); return True
+
+def drain_typed(stdscr, st: State):
+    """Append the printable keys already queued behind a typed one (a paste) to the prompt in one
+    pass, so they skip the per-key trip through the main loop; the first other key is pushed back"""
+    stdscr.timeout(0)
+    try:
+        c = stdscr.getch()
+        while 32 <= c < 127: st.input_buf.append(c); c = stdscr.getch()
+        if c != -1: curses.ungetch(c)
+    except Exception: pass
+    finally: stdscr.timeout(-1)
+    st.dirty |= DIRTY_STATUS
+
+def on_resize(stdscr, st: State):
+    """Re-read the terminal size after KEY_RESIZE; the cached geometry and full redraw only change when it did"""
+    if sys.platform.startswith("win"):
+        try: curses.resize_term(0, 0)  # PDCurses only adopts the new console size when asked
+        except Exception: pass
+    h, w = stdscr.getmaxyx()
+    if (h, w) != (st.height, st.width): st.resize(h, w); st.force_redraw = True
+
 def main_curses(stdscr):
     try: curses.curs_set(0)
     except Exception: pass
     stdscr.keypad(True)
-    try: curses.mousemask(curses.ALL_MOUSE_EVENTS | curses.REPORT_MOUSE_POSITION)
+    stdscr.timeout(-1)  # fully blocking getch: no wakeups and no redraws between events
+    # only what the mouse branch handles: no motion reports, and presses arrive at once
+    # instead of waiting out the click interval to be merged into CLICKED events
+    try: curses.mousemask(curses.BUTTON1_PRESSED | curses.BUTTON4_PRESSED | curses.BUTTON5_PRESSED); curses.mouseinterval(0)
     except Exception: pass
 
     cmap = init_colors() if curses.has_colors() else {}
+    init_ui_attrs(); sel_attr = UI_ATTR["select"]
     st = State(); st.reload()
-    last_check = time.time()
+    last_check = time.time(); last_draw = 0.0
 
     while True:
-        h,w = stdscr.getmaxyx()
+        if not st.height: st.resize(*stdscr.getmaxyx())
+        h, w = st.height, st.width
         
-        # Force clear and redraw if needed
-        if st.force_redraw:
-            stdscr.clear()
-            st.force_redraw = False
-        else:
-            stdscr.erase()
-            
         if h < MIN_H or w < MIN_W:
-            clipped_add(stdscr, 0, 0, f"Resize terminal min {MIN_W}x{MIN_H}", w-1)
-            stdscr.refresh()
-            c = stdscr.getch()
-            if c == ord('q'): break
+            # the notice is only repainted when something (a resize) changed; other keys are ignored
+            if st.dirty:
+                stdscr.erase(); st.force_redraw = True
+                clipped_add(stdscr, 0, 0, RESIZE_MSG, w-1)
+                stdscr.noutrefresh(); curses.doupdate(); st.dirty = 0
+            stdscr.timeout(-1); c = stdscr.getch()
+            if c == KEY_Q: break
+            if c == curses.KEY_RESIZE: on_resize(stdscr, st)
             continue
 
+        # Full clear only when forced; otherwise panes repaint just the rows that changed
+        if st.force_redraw:
+            stdscr.clear(); st.invalidate_shadows()
+            st.force_redraw = False
+
+        # a background preview read finished since the last pass
+        if st._io_pending and st.collect_io(): st.dirty |= DIRTY_PREVIEW
+
+        leftw = st.left_w; left_h = h-2
+        # Draw only the panes the last event changed; skip the frame when none did, and
+        # while more input is queued keep handling it until the frame budget is spent
+        if st.dirty and (time.monotonic() - last_draw >= FRAME_MIN or not input_pending(stdscr)):
+            # a read landing mid-frame (draw_preview waits on it) can dirty panes again; only the
+            # bits this frame started from are cleared, so those wait for the next one
+            drawn = st.dirty
+            if st.dirty & DIRTY_BROWSER:
+                # Make sure the selected entry is visible within the left pane before drawing.
+                try:
+                    st.ensure_visible(left_h, scrolloff=5)
+                except Exception:
+                    pass
+                draw_browser(stdscr, st, leftw, left_h, sel_attr)
+            if st.dirty & DIRTY_PREVIEW: draw_preview(stdscr, st, leftw, w, left_h, cmap)
+            # while typing the status pane also parks the cursor, so it always goes last
+            if st.dirty & DIRTY_STATUS or st.cursor_visible: draw_status(stdscr, st, w, h)
+            # one terminal flush per frame
+            stdscr.noutrefresh(); curses.doupdate()
+            st.dirty &= ~drawn; last_draw = time.monotonic()
+
+        # watch for outside changes after the frame is out, so the first key after idle never waits
+        # on it; one stat of cwd, and a relisting only when its mtime moved
         if time.time() - last_check > 0.8:
+            last_check = time.time()
             try:
-                entries_now = sorted(list(st.cwd.iterdir()), key=lambda p:(not p.is_dir(), p.name.lower()))
-                if [p.name for p in entries_now] != [p.name for p in st.entries]:
-                    st.reload(); st.status = "fs changed"
+                mtime = os.stat(st.cwd).st_mtime_ns
+                if mtime != st.cwd_mtime:
+                    st.cwd_mtime = mtime
+                    if [e.name for e in list_entries(st.cwd)] != st.names:
+                        st.reload(); st.status = "fs changed"; continue
             except Exception:
                 pass
-            last_check = time.time()
-
-        leftw = max(20, w//4); left_h = h-2
-        # Make sure the selected entry is visible within the left pane before drawing.
-        try:
-            st.ensure_visible(left_h, scrolloff=5)
-        except Exception:
-            pass
-        draw_browser(stdscr, st, leftw, left_h, curses.A_REVERSE)
-        draw_preview(stdscr, st, leftw, w, left_h, cmap)
-        draw_status(stdscr, st, w, h)
-        try: curses.curs_set(1 if st.mode in ("prompt","fuzzy") else 0)
-        except Exception: pass
-        stdscr.refresh()
 
+        # block on input, except while a preview read is out: then wake to pick it up
+        stdscr.timeout(IO_POLL_MS if st._io_pending else -1)
         try: key = stdscr.getch()
         except KeyboardInterrupt: break
         except Exception: continue
+        if key == -1: continue
+
+        if key == curses.KEY_RESIZE:
+            on_resize(stdscr, st); continue
 
         if key == curses.KEY_MOUSE:
             try:
                 _, mx, my, _, bstate = curses.getmouse()
                 if 0 <= mx < leftw and 0 <= my < left_h:
                     new = st.top + my
-                    if 0 <= new < len(st.entries): st.selected = new; st.preview_scroll = 0; st.preview_line = None; st.selection_mode=False
+                    if 0 <= new < st.entry_count: st.selected = new; st.preview_scroll = 0; st.preview_line = None; st.selection_mode=False
                 elif mx >= leftw and 0 <= my < left_h:
+                    # a wheel burst is summed into one scroll step so it costs a single redraw
+                    wheel = 0
+                    if bstate & curses.BUTTON4_PRESSED: wheel = -WHEEL_STEP + wheel_burst(stdscr, leftw)
+                    elif bstate & curses.BUTTON5_PRESSED: wheel = WHEEL_STEP + wheel_burst(stdscr, leftw)
                     if st.show_output and st.last_output:
-                        if bstate & curses.BUTTON4_PRESSED: st.out_scroll = max(0, st.out_scroll - 3)
-                        elif bstate & curses.BUTTON5_PRESSED:
-                            total = len(st.last_output.splitlines()); st.out_scroll = min(max(0, total-(left_h-1)), st.out_scroll + 3)
-                    elif st.entries and st.selected_path().is_file():
+                        if wheel:
+                            st.out_scroll = max(0, min(st.output_max_scroll(), st.out_scroll + wheel))
+                    elif st.entries and st.is_file[st.selected]:
                         if bstate & curses.BUTTON1_PRESSED:
                             cl = st.preview_scroll + my + 1; st.preview_line = cl
                             if st.selection_mode: st.sel_end = cl
-                        elif bstate & curses.BUTTON4_PRESSED: st.preview_scroll = max(0, st.preview_scroll - 3)
-                        elif bstate & curses.BUTTON5_PRESSED:
-                            txt = safe_read(st.selected_path()); total = len(txt.splitlines()); st.preview_scroll = min(max(0, total-(left_h-1)), st.preview_scroll + 3)
+                        elif wheel:
+                            st.preview_scroll = max(0, min(st.preview_max_scroll(st.selected_path()), st.preview_scroll + wheel))
             except Exception:
                 pass
             continue
@@ -985,6 +1867,7 @@ def main_curses(stdscr):
         if st.mode in ("prompt","fuzzy"):
             res = handle_prompt(st, key)
             if res == "quit": break
+            if 32 <= key < 127 and st.mode in ("prompt","fuzzy"): drain_typed(stdscr, st)
             continue
 
         try:
@@ -0,0 +1,100 @@
+import os, stat, sys
+
+import pytest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import init as fi
+
+
+def test_copy_tree_read_only_dir(tmp_path):
+    src = tmp_path / "src"; (src / "ro" / "deep").mkdir(parents=True)
+    (src / "top.txt").write_text("top"); (src / "ro" / "a.txt").write_text("a"); (src / "ro" / "deep" / "b.txt").write_text("b")
+    os.chmod(src / "ro", 0o555)
+    try:
+        fi.copy_tree(src, tmp_path / "dst")
+        dst = tmp_path / "dst"
+        assert (dst / "top.txt").read_text() == "top"
+        assert (dst / "ro" / "a.txt").read_text() == "a" and (dst / "ro" / "deep" / "b.txt").read_text() == "b"
+        assert stat.S_IMODE(os.stat(dst / "ro").st_mode) == 0o555
+    finally:
+        for d in (src / "ro", tmp_path / "dst" / "ro"):
+            if d.exists(): os.chmod(d, 0o755)
+
+
+def _grep_reference(txt, q):
+    return [(i, line.strip()) for i, line in enumerate(txt.splitlines(), 1) if q.lower() in line.lower()]
+
+
+def test_search_lines_numbers_like_splitlines(tmp_path):
+    texts = {"ff.py": "a\n\x0cfoo\n", "crlf.txt": "x\r\nfoo\r\ny foo\r\n", "cr.txt": "a\rb\rfoo\n",
+             "seps.txt": "a\x0bb\x1cc\x85d e foo\nFOO\n", "plain.txt": "foo\nbar\n\nfoo bar\n"}
+    for name, txt in texts.items(): (tmp_path / name).write_text(txt, encoding="utf-8", newline="")
+    got = fi.search_lines(tmp_path, "foo")
+    for name, txt in texts.items():
+        assert [(ln, line) for rel, ln, line in got if rel == name] == _grep_reference(txt, "foo"), name
+    assert ("ff.py", 3, "\x0cfoo".strip()) in got
+
+
+def _char_classes(stream, Token):
+    top = (Token.Keyword, Token.Name.Function, Token.Name.Class, Token.String, Token.Comment, Token.Number)
+    out = []
+    for ttype, val in stream:
+        cls = next((t for t in top if ttype in t), None)
+        out.extend(cls for ch in val if not ch.isspace())
+    return out
+
+
+def test_lex_python_matches_pygments():
+    pytest.importorskip("pygments")
+    assert fi.load_pygments()
+    from pygments import lex
+    from pygments.lexers import PythonLexer
+    src = ('def fn(a, b=1):\n    """doc"""\n    x = "foo {a}" + \'f{x}\' + "fa"\n'
+           '    y = f"v={a!r:>10} {{b}}" + rf\'{a}\\d\' + Rb"raw" + F"{x}"\n    return 0x1F  # done\n'
+           'class C:\n    def __init__(self): pass\n')
+    toks = list(fi.lex_python(src))
+    assert "".join(v for _, v in toks) == src
+    assert _char_classes(toks, fi.Token) == _char_classes(lex(src, PythonLexer(stripnl=False)), fi.Token)
+
+
+def test_gitignore_fallback_anchoring(tmp_path, monkeypatch):
+    monkeypatch.setattr(fi, "HAVE_PATHSPEC", False)
+    (tmp_path / "sub" / "docs").mkdir(parents=True); (tmp_path / "docs").mkdir(); (tmp_path / "build").mkdir()
+    for rel in ("top.txt", "sub/top.txt", "docs/a.md", "sub/docs/a.md", "x.tmp", "sub/keep.tmp", "build/out.txt", "sub/b.txt"):
+        (tmp_path / rel).write_text("x")
+    (tmp_path / ".gitignore").write_text("/top.txt\ndocs/*.md\n*.tmp\n!keep.tmp\nbuild/\n")
+    got = {rel.replace(os.sep, "/") for rel, _ in fi.walk_files(tmp_path, text_only=False)}
+    assert got == {".gitignore", "sub/top.txt", "sub/docs/a.md", "sub/keep.tmp", "sub/b.txt"}
+
+
+def test_background_reads_land_in_their_caches(tmp_path):
+    (tmp_path / "a.txt").write_text("one\ntwo\n"); (tmp_path / "b.txt").write_text("bee\n"); (tmp_path / "sub").mkdir()
+    st = fi.State(cwd=tmp_path)
+    a, b, sub = str(tmp_path / "a.txt"), str(tmp_path / "b.txt"), str(tmp_path / "sub")
+    st.post_io("file", a, "s1"); st.post_io("dir", sub, "d1")
+    while st._io_pending: st.collect_io(1.0)
+    assert st._preview_cache[a] == ("s1", "one\ntwo\n", ["one", "two"])
+    assert st._dir_cache[sub] == ("d1", [])
+    # a :cat the user already replaced only warms the cache; the newer one is shown
+    st._io_pending["cat"] = (b, "s3"); st._io_jobs.put(("cat", a, "s2"))
+    while "s2" != st._preview_cache[a][0]: st.collect_io(0.2)
+    assert st._preview_cache[a][0] == "s2" and not st.show_output
+    st.post_io("cat", b, "s4")
+    while st._io_pending: st.collect_io(1.0)
+    assert st.show_output and st.last_output == "bee\n"
+
+
+def test_dd_deletes_and_other_keys_disarm(tmp_path):
+    (tmp_path / "a.tmp").write_text("a"); (tmp_path / "b.tmp").write_text("b")
+    st = fi.State(cwd=tmp_path); st.reload(); st.selected = st.index_of("a.tmp")
+    fi.handle_keys(st, ord('d'), None, {}, {}); fi.handle_keys(st, ord('y'), None, {}, {}); fi.handle_keys(st, ord('d'), None, {}, {})
+    assert (tmp_path / "a.tmp").exists() and st.mode == "maybe_delete"
+    fi.handle_keys(st, ord('d'), None, {}, {})
+    assert not (tmp_path / "a.tmp").exists() and (tmp_path / "b.tmp").exists() and st.mode == "browser"
+
+
+def test_vs16_widens_only_a_narrow_base():
+    assert fi.display_width("Y️") == 2 and fi.display_width("Y️️") == 2
+    assert fi.display_width("中️") == 2 and fi.display_width("️Y") == 1
+    assert fi.truncate_to("Y️️zz", 3) == "Y️️z"